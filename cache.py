@@ -0,0 +1,86 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.1
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Fitness cache keyed on the tree's string
+
+End Change Log
+
+Fitness cache for the GP.
+
+The elite clone and everything varAnd did not touch get evaluated again every
+generation. The cache is keyed on str(individual) and keeps up to `samples`
+(stochastic) fitness evaluations per tree. The fitness given back is the
+running mean of the samples.
+
+A tree is only evaluated again if it has fewer than `samples` samples. If the
+same tree shows up more than once in a population it is only evaluated once.
+
+    samples = 1     Never evaluate the same tree twice
+    samples = 5     Keep evaluating a tree until it has 5 samples, then stop
+
+NOTE: With dynamic graphs the graph changes while we evaluate, so old samples
+      were taken on a (slightly) different graph.
+
+'''
+
+###########
+# Imports #
+###########
+
+import numpy as np
+
+
+class FitnessCache(object):
+
+    def __init__(self, samples=1):
+        self.samples = samples
+
+        # key -> [number of samples, mean fitness (array)]
+        self.fitnesses = {}
+
+    def __len__(self):
+        return len(self.fitnesses)
+
+    def __contains__(self, key):
+        return key in self.fitnesses
+
+    # Mean fitness of a key (tuple)
+    def __getitem__(self, key):
+        return tuple(self.fitnesses[key][1].tolist())
+
+    # Number of samples a key has
+    def count(self, key):
+        if key in self.fitnesses:
+            return self.fitnesses[key][0]
+        return 0
+
+    # Keys that need evaluating
+    # A key shows up once for every sample it is missing (duplicate keys only counted once)
+    def missing(self, keys):
+        to_evaluate = []
+        for key in dict.fromkeys(keys):
+            to_evaluate += [key] * max(0, self.samples - self.count(key))
+        return to_evaluate
+
+    # Add a new sample to a key (running mean)
+    def add(self, key, fitness):
+        fitness = np.asarray(fitness, dtype=float)
+        if key not in self.fitnesses:
+            self.fitnesses[key] = [1, fitness]
+        else:
+            n, mean = self.fitnesses[key]
+            self.fitnesses[key] = [n + 1, mean + (fitness - mean)/(n + 1)]
+
+    def update(self, keys, fitnesses):
+        for key, fitness in zip(keys, fitnesses):
+            self.add(key, fitness)
+
+    def clear(self):
+        self.fitnesses = {}
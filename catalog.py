@@ -0,0 +1,143 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.3
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Cached summary measures of results files for the stats tables
+
+    0.2 (October 18, 2026):
+        - Traveler definition of each results file (get_traveler_definition)
+            * check_traveler_definitions warns when the files compared used different ones
+
+    0.3 (October 18, 2026):
+        - MEASURE_KEYS comes from trajectories instead of a copy that could drift
+
+End Change Log
+
+Results catalog.
+
+Every table in eCov-stats needs the same per replicate summary measures
+(final susceptible, max infected, mitigations, etc.) of a results file, and
+the same files get loaded over and over for different tables. The catalog
+calculates the measures of a results file once and keeps them
+
+    - in memory, for as long as the catalog is around
+    - on disk, as <cache_directory>/<name>.npy (measures x replicates), memory mapped when loaded
+
+The measures are calculated again if the results file is newer (mtime) than
+what was cached.
+
+The catalog also gives the traveler definition each results file was made with
+(measures.get_traveler_definition), None for pickles and results saved before
+it was recorded, and check_traveler_definitions warns when files that are
+about to be compared used different ones.
+
+Results files can be trajectories (.npz) or the pickled iteration dicts
+(.pkl), npz is used if there is one.
+
+'''
+
+###########
+# Imports #
+###########
+
+import numpy as np
+import os
+import pickle
+
+import trajectories
+
+# Measures kept for each results file (same as get_single_measures)
+from trajectories import MEASURE_KEYS
+
+
+class ResultsCatalog(object):
+
+    # cache_directory defaults to <directory>/catalog/
+    def __init__(self, directory, cache_directory=None):
+        self.directory = directory
+        if cache_directory is None:
+            cache_directory = os.path.join(directory, 'catalog')
+        self.cache_directory = cache_directory
+
+        # name -> (mtime of the results file, measures)
+        self.measures = {}
+
+        # name -> (mtime of the results file, traveler definition)
+        self.traveler_definitions = {}
+
+    # Results file for a name (npz if there is one, otherwise the pickle)
+    def get_path(self, f_name):
+        path = os.path.join(self.directory, f_name + '.npz')
+        if os.path.exists(path):
+            return path
+        return os.path.join(self.directory, f_name + '.pkl')
+
+    def get_cache_path(self, f_name):
+        return os.path.join(self.cache_directory, f_name + '.npy')
+
+    # Dict of measure -> array (one value per replicate)
+    def get_measures(self, f_name):
+        path = self.get_path(f_name)
+        mtime = os.path.getmtime(path)
+        if f_name in self.measures and self.measures[f_name][0] == mtime:
+            return self.measures[f_name][1]
+
+        cache_path = self.get_cache_path(f_name)
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= mtime:
+            array = np.load(cache_path, mmap_mode='r')
+        else:
+            array = self.calculate(path)
+            self.save(cache_path, array)
+
+        measures = dict(zip(MEASURE_KEYS, array))
+        self.measures[f_name] = (mtime, measures)
+        return measures
+
+    # Traveler definition a results file was made with (None if it was not saved with it)
+    def get_traveler_definition(self, f_name):
+        path = self.get_path(f_name)
+        mtime = os.path.getmtime(path)
+        if f_name in self.traveler_definitions and self.traveler_definitions[f_name][0] == mtime:
+            return self.traveler_definitions[f_name][1]
+
+        definition = None
+        if path.endswith('.npz'):
+            with np.load(path) as data:
+                if 'traveler_definition' in data.files:
+                    definition = str(data['traveler_definition'])
+
+        self.traveler_definitions[f_name] = (mtime, definition)
+        return definition
+
+    # Prints a warning (and returns False) if the results files were not all made with the same traveler definition
+    def check_traveler_definitions(self, f_names):
+        definitions = {f_name: self.get_traveler_definition(f_name) for f_name in f_names}
+        if len(set(definitions.values())) <= 1:
+            return True
+        print('WARNING: Comparing results made with different traveler definitions (None is unknown, older results):')
+        for f_name, definition in definitions.items():
+            print('\t' + f_name + ': ' + str(definition))
+        return False
+
+    # Measures of a results file as an array (measures x replicates)
+    def calculate(self, path):
+        if path.endswith('.npz'):
+            results = trajectories.load_trajectories(path)
+        else:
+            results = trajectories.from_iterations(*pickle.load(open(path, 'rb')))
+        measures = trajectories.get_single_measures(results)
+        return np.array([measures[k] for k in MEASURE_KEYS], dtype=np.int64)
+
+    # Written to a temp file first so a half written file is never loaded
+    def save(self, cache_path, array):
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        tmp = cache_path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp, cache_path)
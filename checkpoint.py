@@ -0,0 +1,130 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.1
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Periodic checkpoints of the GP so a run that dies can be resumed
+
+End Change Log
+
+Checkpoints for the GP.
+
+A checkpoint is a dict with everything needed to carry on where the run
+stopped (population, logbook, generation, fitness cache, ...) plus the states
+of random and np.random, pickled to one file.
+
+Writes are atomic, the pickle goes to a temp file that then replaces the
+checkpoint, so a run killed mid write still has the last good checkpoint.
+
+Writes are also in the background. The state is pickled right away (so the
+GP can go on changing the population) and a writer thread puts the bytes on
+disk. If a write is still going when the next checkpoint comes in only the
+newest one is kept waiting, older ones are never written.
+
+NOTE: The workers of the pool have their own random states and (with
+      dynamic graphs) their own drifted copies of the graph, neither is in
+      the checkpoint. A resumed run is only exactly the same as the original
+      if the evaluations are seeded (CRN) on a static graph.
+
+'''
+
+###########
+# Imports #
+###########
+
+import numpy as np
+import os
+import pickle
+import random
+import threading
+
+
+# States of random and np.random
+def get_rng_state():
+    return {'random': random.getstate(), 'np.random': np.random.get_state()}
+
+def set_rng_state(state):
+    random.setstate(state['random'])
+    np.random.set_state(state['np.random'])
+
+# Written to a temp file first so a half written file is never loaded
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# Checkpoint dict (with the random states under 'rng')
+def save_checkpoint(path, state):
+    write_atomic(path, pickle.dumps(dict(state, rng=get_rng_state())))
+
+# Checkpoint dict, random and np.random are set back to where they were
+def load_checkpoint(path):
+    state = pickle.load(open(path, 'rb'))
+    set_rng_state(state['rng'])
+    return state
+
+
+class Checkpointer(object):
+
+    # Checkpoint to path every `every` generations
+    def __init__(self, path, every=10):
+        self.path = path
+        self.every = every
+
+        # Newest pickled checkpoint waiting to be written
+        self.pending = None
+        self.writing = False
+        self.condition = threading.Condition()
+        self.closed = False
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # If generation g should be checkpointed
+    def due(self, g):
+        return self.every > 0 and g % self.every == 0
+
+    # Pickled now, written by the writer thread
+    def save(self, state):
+        data = pickle.dumps(dict(state, rng=get_rng_state()))
+        with self.condition:
+            self.pending = data
+            self.condition.notify_all()
+
+    # Writer thread
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                data = self.pending
+                self.pending = None
+                self.writing = True
+            write_atomic(self.path, data)
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    # Block until everything saved so far is on disk
+    def wait(self):
+        with self.condition:
+            while self.pending is not None or self.writing:
+                self.condition.wait()
+
+    # Write whatever is left and stop the writer thread
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
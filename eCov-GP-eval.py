@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       December 4, 2020
 
-Version:    0.3
+Version:    0.18
 
 
 Change Log:
@@ -17,14 +17,61 @@ Change Log:
     0.3 (April 26, 2021):
         - Small change to enable dynamic graphs
 
+    0.4 (October 18, 2026):
+        - VECTORIZED flag to evaluate the population with vectorized compiled trees
+
+    0.5 (October 18, 2026):
+        - Evaluate the population on a process pool (parallel) instead of SCOOP
+            * PROCESSES from SLURM (cpus-per-task) or the number of cores
+
+    0.6 (October 18, 2026):
+        - Optional fitness cache (CACHE_SAMPLES) keyed on the tree's string
+            * Trees with enough samples are not evaluated again, fitness is the mean of the samples
+
+    0.7 (October 18, 2026):
+        - Optional behavioural fingerprints (FINGERPRINT) so trees that do the same thing share one simulation
+
+    0.8 (October 18, 2026):
+        - Distance matrix (one BFS per node) calculated once and used for all the distance measures
+
+    0.9 (October 18, 2026):
+        - Static graph measures come from a GraphMeasures object (cached on disk by graph hash in MEASURES_DIRECTORY)
+
+    0.10 (October 18, 2026):
+        - UPDATE_MEASURES flag to keep the static measures up to date on the dynamic graph (STALENESS days for global ones)
+
+    0.11 (October 18, 2026):
+        - CRN flag for common random numbers, everyone in a generation is evaluated on the same outbreak (seed CRN_SEED + generation)
+
+    0.12 (October 18, 2026):
+        - RACING flag to race the final population over the validation graphs (racing), dropping clearly worse candidates early
+
+    0.13 (October 18, 2026):
+        - The N_GRAPHS to test on (and their measures) come from a graph ensemble kept in ENSEMBLE_DIRECTORY
+
+    0.14 (October 18, 2026):
+        - Island model (islands), the SLURM array tasks migrate their best individuals around a ring every MIGRATION_EVERY generations
+
+    0.15 (October 18, 2026):
+        - SELECTION option for NSGA-II/NSGA-III (Pareto) selection of survivors from parents + offspring
+        - Pareto front of everything evaluated kept across generations and saved with the results
+
+    0.16 (October 18, 2026):
+        - ISLAND_MODEL flag (off by default), array tasks stay independent runs unless it is on
+
+    0.17 (October 18, 2026):
+        - NSGA: parents are evaluated again with their offspring (same CRN seed and draw) before picking survivors
+        - Note on the saved pareto_front, each member's fitness is from one evaluation
+
+    0.18 (October 18, 2026):
+        - FINGERPRINT_STATES = 1024 (small blocks of rows from each, see fingerprint)
+
 End Change Log
 
 Combine eCov-GP and the results-population such that we get the results and the validated results all in one shot
 
 '''
 
-# Can use this ipython -m scoop eCov-GP.py
-
 ###########
 # Imports #
 ###########
@@ -55,7 +102,13 @@ from ndlib.viz.mpl.DiffusionPrevalence import DiffusionPrevalence
 from measures import * 
 from language import *
 
+import cache
+import ensemble
 import evaluate
+import fingerprint
+import islands
+import parallel
+import racing
 import sgp
 import snetwork
 
@@ -106,6 +159,10 @@ TRI_P = 0.66
 ITERATIONS = 98
 MEASURE_EVERY = 7
 MITIGATIONS_PER_MEASURE = 30
+
+# Where to cache the static graph measures (None means do not cache)
+MEASURES_DIRECTORY = './measures/'
+
 ROLLOVER = False
 USE_ALL = False
 
@@ -114,26 +171,81 @@ DYNAMIC = True
 ADD_p = 0.01
 REMOVE_p = 0.01
 
+# Keep the static measures up to date as the graph changes
+# Global measures (pagerank, distances, etc.) are recalculated once they are STALENESS days old
+UPDATE_MEASURES = False
+STALENESS = 14
+
+# Compile trees to vectorized functions (score all candidate nodes at once)
+VECTORIZED = False
+
+# Number of processes to evaluate the population with (1 means no pool)
+PROCESSES = parallel.get_processes()
+
+# Fitness cache, number of samples to keep for each tree (0 means no cache, evaluate everyone every time)
+CACHE_SAMPLES = 0
+
+# Trees that behave the same on a sample of feature rows share one simulation (and cache entry)
+FINGERPRINT = False
+FINGERPRINT_STATES = 1024
+
+# Common random numbers, everyone in a generation gets the same initial infected and random numbers
+# The seed is CRN_SEED + the generation
+CRN = False
+CRN_SEED = 0
+
+# Selection, 'tournament' (lexicographic on the fitness values, with elitism)
+# or 'nsga2'/'nsga3' for multi objective selection, survivors are picked from the parents and offspring by Pareto rank
+# NSGA evaluates the parents again every generation too (twice the evaluations)
+SELECTION = 'tournament'
+
+# Island model, each SLURM array task (or ISLAND/ISLANDS local process) is an island
+# Every MIGRATION_EVERY generations the MIGRANTS best go to the next island around the ring (replacing its worst)
+# Off means every array task is its own independent run
+ISLAND_MODEL = False
+ISLAND, N_ISLANDS = islands.get_island() if ISLAND_MODEL else (0, 1)
+MIGRATION_DIRECTORY = islands.get_run_directory('./migration/')
+MIGRATION_EVERY = 10
+MIGRANTS = 5
+
 ###########
 
 
 # How to evaluate the whole population 
 # Calls stuff from evaluate 
-def evaluate_population(pop):
-    # Only worry about individuals with INVALID fitness values
-    # This will save some time
-    #invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-    #fitnesses = list(map(toolbox.evaluate, invalid_ind))
-    compiled_pop = list(map(toolbox.compile, pop))
-    fitnesses = list(map(toolbox.evaluate, compiled_pop))
-    #for ind, fit in zip(invalid_ind, fitnesses):
+def evaluate_population(pop, gen):
+    trees = [str(ind) for ind in pop]
+
+    # Common random numbers for this generation
+    extra = {'seed': CRN_SEED + gen} if CRN else {}
+
+    # Behaviourally identical trees get the same key
+    if FINGERPRINT:
+        keys = [fingerprint.fingerprint(toolbox.compile_vectorized(ind), fingerprint_sample) for ind in pop]
+    else:
+        keys = trees
+    # One tree to actually evaluate for each key
+    key_tree = dict(zip(keys, trees))
+
+    if CACHE_SAMPLES > 0:
+        # With common random numbers older samples were from a different outbreak
+        if CRN:
+            fitness_cache.clear()
+        # Only evaluate the trees that are missing samples
+        to_evaluate = fitness_cache.missing(keys)
+        fitness_cache.update(to_evaluate, parallel.evaluate_trees(pool, [key_tree[key] for key in to_evaluate], **extra))
+        fitnesses = [fitness_cache[key] for key in keys]
+    elif FINGERPRINT:
+        key_fitness = dict(zip(key_tree, parallel.evaluate_trees(pool, list(key_tree.values()), **extra)))
+        fitnesses = [key_fitness[key] for key in keys]
+    else:
+        # Only the trees (as strings) go to the workers, the fitnesses come back
+        fitnesses = parallel.evaluate_trees(pool, trees, **extra)
+
     for ind, fit in zip(pop, fitnesses):
-        # DO NOT FORGET TO UNPACK THE DICTS WITH TEENDS AND WHATNOT!!!!!
-        final_susceptible, max_infected, total_infected, final_removed = evaluate.convert_iterations(fit[0], model)
-        total_mitigations, effective_mitigations, ineffective_mitigations = evaluate.convert_iterations_mitigations(fit[1])
         #ind.fitness.values = (final_susceptible, total_mitigations, max_infected, total_infected, )
         #ind.fitness.values = (final_susceptible, )
-        ind.fitness.values = (max_infected, total_infected, )
+        ind.fitness.values = fit
 
 
 ##################
@@ -153,23 +265,25 @@ model = snetwork.setup_network(size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_
 
 
 # Identify Static Whole Graph Measures
-travelers = get_travelers(model)
-average_degree = get_average_degree(model)
-shortest_distances = get_shortest_distances_all_nodes(model)
-average_distance = get_avg_distances_all_nodes(model)
-
-# Phase PCG Phase 2 add
-vertex_average_distance = get_node_avg_distances_all_nodes(model)
-minimal_vertex_cover = get_min_vertex_cover(model)
-number_shortest_paths = get_node_number_shortest_paths(model)
-page_rank = get_all_page_rank(model)
-cluster_coef = clustering_coefficient(model)
+graph_measures = GraphMeasures(model, cache_directory=MEASURES_DIRECTORY)
 
 ############
 # GP Setup #
 ############
 
-toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, m=model, traveler_set=travelers, mvc_set=minimal_vertex_cover, vert_avg_dist=vertex_average_distance, number_vertex_shortest=number_shortest_paths, Page_Rank=page_rank, Cluster_Coeff=cluster_coef, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL, use_dynamic=DYNAMIC, ADD_p=ADD_p, REMOVE_p=REMOVE_p)
+evaluation_params = dict(m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL, use_dynamic=DYNAMIC, ADD_p=ADD_p, REMOVE_p=REMOVE_p, update_measures=UPDATE_MEASURES, staleness=STALENESS)
+
+toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, selection=SELECTION, vectorized=VECTORIZED, **evaluation_params)
+
+# Workers get the model and measures once, here
+pool = parallel.setup_pool(PROCESSES, language, evaluate.evaluate_individual, vectorized=VECTORIZED, **evaluation_params)
+
+fitness_cache = cache.FitnessCache(samples=CACHE_SAMPLES)
+
+island_model = islands.Islands(MIGRATION_DIRECTORY, ISLAND, N_ISLANDS, migrants=MIGRANTS, every=MIGRATION_EVERY)
+
+if FINGERPRINT:
+    fingerprint_sample = fingerprint.get_fingerprint_sample(states=FINGERPRINT_STATES, **evaluation_params)
 
 
 #######################
@@ -178,15 +292,40 @@ toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual,
 
 population = toolbox.population(n=POPULATION)
 
+# Survivors of the last generation (NSGA)
+parents = []
+
+# Non dominated individuals of everything evaluated so far
+pareto_front = tools.ParetoFront()
+
 print('Starting Evolution')
 for g in range(GENERATIONS):
 
     if g % (0.1 * GENERATIONS) == 0:
         print(g/GENERATIONS)
 
-    evaluate_population(population)
+    # Parents (NSGA) are evaluated again with their offspring, so everyone is ranked on the same outbreak (CRN) and draw
+    population[:] = parents + population
+    evaluate_population(population, g)
+    pareto_front.update(population)
+
+    # Survivors of the parents and offspring (NSGA-II/III)
+    if SELECTION != 'tournament':
+        population[:] = toolbox.survive(population, POPULATION)
+
     record = mstats.compile(population)
     logbook.record(gen=g, **record)
+
+    # Best to the next island, the previous island's best in place of our worst
+    if island_model.due(g):
+        island_model.migrate(population, g, toolbox)
+
+    # Parents (already survivors, so no elitism needed) and their offspring
+    if SELECTION != 'tournament':
+        parents = population[:]
+        offspring_clone = list(map(toolbox.clone, toolbox.select(population, len(population))))
+        population[:] = algorithms.varAnd(offspring_clone, toolbox, CROSSOVER, MUTATION)
+        continue
     
     # Elitism
     best = toolbox.elitism(population)  # For elitism
@@ -207,7 +346,11 @@ for g in range(GENERATIONS):
     
 print('Ending Evolution')
 
-evaluate_population(population)
+population[:] = parents + population
+evaluate_population(population, GENERATIONS)
+pareto_front.update(population)
+if SELECTION != 'tournament':
+    population[:] = toolbox.survive(population, POPULATION)
 record = mstats.compile(population)
 logbook.record(gen=GENERATIONS, **record)
 
@@ -218,14 +361,20 @@ logbook.chapters["size"].header = "min", "avg", "max"
 
 print(logbook)
 
+if pool is not None:
+    pool.close()
+    pool.join()
+
 
 ################
 # Save Results #
 ################
 
 print('Saving Results')
-results = dict(population=population, logbook=logbook)
-RESULTS_NAME = datetime.datetime.now().strftime("%m-%d-%Y_%H-%M-%S") + '.pkl'
+# NOTE: pareto_front is every individual that was ever non dominated, each on the fitness of ONE (stochastic) evaluation
+#       Lucky outbreaks (died out early) stay in it, so evaluate it again (eg. on the validation graphs) before trusting it
+results = dict(population=population, logbook=logbook, pareto_front=list(pareto_front))
+RESULTS_NAME = datetime.datetime.now().strftime("%m-%d-%Y_%H-%M-%S") + ('_island' + str(ISLAND) if N_ISLANDS > 1 else '') + '.pkl'
 pickle.dump(results, open(os.path.join(RESULTS_DIRECTORY, RESULTS_NAME),'wb'))
 
 
@@ -237,6 +386,16 @@ pickle.dump(results, open(os.path.join(RESULTS_DIRECTORY, RESULTS_NAME),'wb'))
 # Graphs to Test on
 N_GRAPHS = 50
 
+# Where the graphs to test on are kept (ensemble)
+ENSEMBLE_DIRECTORY = './ensembles/'
+
+# Race the candidates over the graphs (racing) instead of evaluating everyone on all of them
+# Candidates clearly worse than the best are dropped early
+RACING = False
+RACING_KEY = 'tot_inf'          # Measure to race on (lower is better)
+RACING_MIN_GRAPHS = 5           # Graphs everyone gets before anyone can be dropped
+RACING_ALPHA = 0.05             # Dropped if worse than the best with p < RACING_ALPHA (Mann-Whitney U)
+
 ########################
 # Evaluate on X graphs #
 ########################
@@ -254,100 +413,60 @@ all_results = []
 
 models_measures = {}
 models_measures['graph'] = []
-models_measures['travelers'] = []
-models_measures['average_degree'] = []
-models_measures['shortest_distances'] = []
-models_measures['average_distance'] = []
-models_measures['vertex_average_distance'] = []
-models_measures['minimal_vertex_cover'] = []
-models_measures['number_shortest_paths'] = []
-models_measures['page_rank'] = []
-models_measures['cluster_coef'] = []
-
-# Generate the N_GRAPHS and store them
-for _ in range(N_GRAPHS):
-
-    #model = snetwork.setup_network(directory=GRAPH_DIRECTORY, name=GRAPH_NAME, size=GRAPH_SIZE, alpha=ALPHA, drop=DROP, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
-                
-    # ER
-    #model = snetwork.setup_network(directory=GRAPH_DIRECTORY, name=GRAPH_NAME, size=GRAPH_SIZE, edge_p=EDGE_p, alpha=ALPHA, drop=DROP, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
-               
-    # NWS
-    #model = snetwork.setup_network(directory=GRAPH_DIRECTORY, name=GRAPH_NAME, size=GRAPH_SIZE, rewire_p=REWIRE_p, knn=KNN, alpha=ALPHA, drop=DROP, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
-
-
-    # BA
-    #model = snetwork.setup_network(size=GRAPH_SIZE, m=M, alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
-
-    # PCG
-    model = snetwork.setup_network(size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_P, alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
+models_measures['measures'] = []
+
+# The N_GRAPHS (and their measures) come from a graph ensemble
+# They are made the first time and loaded from ENSEMBLE_DIRECTORY after that
+#validation_graphs = ensemble.GraphEnsemble(ENSEMBLE_DIRECTORY, N_GRAPHS, directory=GRAPH_DIRECTORY, name=GRAPH_NAME)
+
+# ER
+#validation_graphs = ensemble.GraphEnsemble(ENSEMBLE_DIRECTORY, N_GRAPHS, size=GRAPH_SIZE, edge_p=EDGE_p)
+
+# NWS
+#validation_graphs = ensemble.GraphEnsemble(ENSEMBLE_DIRECTORY, N_GRAPHS, size=GRAPH_SIZE, rewire_p=REWIRE_p, knn=KNN, drop=DROP)
+
+# BA
+#validation_graphs = ensemble.GraphEnsemble(ENSEMBLE_DIRECTORY, N_GRAPHS, size=GRAPH_SIZE, m=M)
+
+# PCG
+validation_graphs = ensemble.GraphEnsemble(ENSEMBLE_DIRECTORY, N_GRAPHS, size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_P)
+
+for j in range(N_GRAPHS):
+    model, graph_measures = validation_graphs.get_model(j, alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
     models_measures['graph'].append(model)
+    models_measures['measures'].append(graph_measures)
+
+
+# Evaluate candidate i on graph j
+def evaluate_candidate(i, j):
+    FUNCTION = compiled_pop[i]
+
+    model = models_measures['graph'][j]
 
 
     # Identify Static Whole Graph Measures
-    models_measures['travelers'].append(get_travelers(model))
-    models_measures['average_degree'].append(get_average_degree(model))
-    models_measures['shortest_distances'].append(get_shortest_distances_all_nodes(model))
-    models_measures['average_distance'].append(get_avg_distances_all_nodes(model))
-
-    # Phase PCG Phase 2 add
-    models_measures['vertex_average_distance'].append(get_node_avg_distances_all_nodes(model))
-    models_measures['minimal_vertex_cover'].append(get_min_vertex_cover(model))
-    models_measures['number_shortest_paths'].append(get_node_number_shortest_paths(model))
-    models_measures['page_rank'].append(get_all_page_rank(model))
-    models_measures['cluster_coef'].append(clustering_coefficient(model))
-
-
-for i, f in enumerate(compiled_pop):
-#for i in range(5):
-    print(i)
-    FUNCTION = f
-    #FUNCTION = compiled_pop[i]
-    #print(population[50])
-    # Dict to hold results
-    results = {}
-    results['sus'] = []
-    results['max_inf'] = []
-    results['tot_inf'] = []
-    results['rem'] = []
-    results['tot_mit'] = []
-    results['eff_mit'] = []
-    results['ine_mit'] = []
-
-    for j in range(N_GRAPHS):
-
-        model = models_measures['graph'][j]
-
-
-        # Identify Static Whole Graph Measures
-        travelers = models_measures['travelers'][j]
-        average_degree = models_measures['average_degree'][j]
-        shortest_distances = models_measures['shortest_distances'][j]
-        average_distance = models_measures['average_distance'][j]
-
-        # Phase PCG Phase 2 add
-        vertex_average_distance = models_measures['vertex_average_distance'][j]
-        minimal_vertex_cover = models_measures['minimal_vertex_cover'][j]
-        number_shortest_paths = models_measures['number_shortest_paths'][j]
-        page_rank = models_measures['page_rank'][j]
-        cluster_coef = models_measures['cluster_coef'][j]
-
-        iterations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, traveler_set=travelers, mvc_set=minimal_vertex_cover, vert_avg_dist=vertex_average_distance, number_vertex_shortest=number_shortest_paths, Page_Rank=page_rank, Cluster_Coeff=cluster_coef, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL, use_dynamic=DYNAMIC, ADD_p=ADD_p, REMOVE_p=REMOVE_p)
-
-        final_susceptible, max_infected, total_infected, final_removed = evaluate.convert_iterations(iterations, model)
-        total_mitigations, effective_mitigations, ineffective_mitigations = evaluate.convert_iterations_mitigations(iterations_mitigations)
-
-        results['sus'].append(final_susceptible)
-        results['max_inf'].append(max_infected)
-        results['tot_inf'].append(total_infected)
-        results['rem'].append(final_removed)
-        results['tot_mit'].append(total_mitigations)
-        results['eff_mit'].append(effective_mitigations)
-        results['ine_mit'].append(ineffective_mitigations)
-        
+    graph_measures = models_measures['measures'][j]
+
+    iterations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL, use_dynamic=DYNAMIC, ADD_p=ADD_p, REMOVE_p=REMOVE_p, update_measures=UPDATE_MEASURES, staleness=STALENESS)
+
+    return racing.get_results(iterations, iterations_mitigations, model)
+
+
+if RACING:
+    all_results, finalists = racing.race(len(compiled_pop), N_GRAPHS, evaluate_candidate, key=RACING_KEY, min_instances=RACING_MIN_GRAPHS, alpha=RACING_ALPHA)
+    print('Finalists:', finalists)
+    print('Evaluations:', racing.count_evaluations(all_results), 'of', len(compiled_pop) * N_GRAPHS)
+
+else:
+    for i in range(len(compiled_pop)):
+        print(i)
+        # Dict to hold results
+        results = racing.new_results()
 
+        for j in range(N_GRAPHS):
+            racing.add_results(results, evaluate_candidate(i, j))
 
-    all_results.append(results)
+        all_results.append(results)
 
 
 
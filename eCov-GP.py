@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       May 19, 2020
 
-Version:    0.17
+Version:    0.32
 
 
 Change Log:
@@ -74,10 +74,62 @@ Change Log:
     0.17 (April 26, 2021):
         - Small change to enable dynamic graphs
 
+    0.18 (October 18, 2026):
+        - VECTORIZED flag to evaluate the population with vectorized compiled trees
+
+    0.19 (October 18, 2026):
+        - Evaluate the population on a process pool (parallel) instead of SCOOP
+            * Model and measures go to each worker once, only trees/fitnesses after that
+            * PROCESSES from SLURM (cpus-per-task) or the number of cores
+
+    0.20 (October 18, 2026):
+        - Optional fitness cache (CACHE_SAMPLES) keyed on the tree's string
+            * Trees with enough samples are not evaluated again, fitness is the mean of the samples
+
+    0.21 (October 18, 2026):
+        - Optional behavioural fingerprints (FINGERPRINT) so trees that do the same thing share one simulation
+
+    0.22 (October 18, 2026):
+        - Distance matrix (one BFS per node) calculated once and used for all the distance measures
+
+    0.23 (October 18, 2026):
+        - Static graph measures come from a GraphMeasures object (cached on disk by graph hash in MEASURES_DIRECTORY)
+
+    0.24 (October 18, 2026):
+        - UPDATE_MEASURES flag to keep the static measures up to date on the dynamic graph (STALENESS days for global ones)
+
+    0.25 (October 18, 2026):
+        - CRN flag for common random numbers, everyone in a generation is evaluated on the same outbreak (seed CRN_SEED + generation)
+
+    0.26 (October 18, 2026):
+        - Checkpoints (checkpoint) every CHECKPOINT_EVERY generations, written in the background
+        - --resume to carry on from the last checkpoint
+
+    0.27 (October 18, 2026):
+        - STEADY_STATE flag for asynchronous steady state evolution (steady) instead of generations
+
+    0.28 (October 18, 2026):
+        - SELECTION option for NSGA-II/NSGA-III (Pareto) selection of survivors from parents + offspring
+        - Pareto front of everything evaluated kept across generations and saved with the results
+
+    0.29 (October 18, 2026):
+        - STEADY_STATE refuses to run with CRN, CACHE_SAMPLES or FINGERPRINT (steady does not use them, they were silently ignored)
+
+    0.30 (October 18, 2026):
+        - NSGA: parents are evaluated again with their offspring (same CRN seed and draw) before picking survivors
+        - Note on the saved pareto_front, each member's fitness is from one evaluation
+
+    0.31 (October 18, 2026):
+        - STEADY_STATE also refuses to run with NSGA SELECTION (it was silently ignored)
+
+    0.32 (October 18, 2026):
+        - FINGERPRINT_STATES = 1024 (small blocks of rows from each, see fingerprint)
+
 End Change Log
 
 
-Run with this: ipython -m scoop eCov-GP.py
+Run with this: python eCov-GP.py
+Carry on from the last checkpoint with: python eCov-GP.py --resume [checkpoint]
 
 
 A GP search for effective vaccination strategies for a given graph
@@ -118,11 +170,10 @@ I think to start the trees will simply be a boolean expression. If true, vac, ot
 
 '''
 
-# Can use this ipython -m scoop eCov-GP.py
-
 ###########
 # Imports #
 ###########
+import argparse
 import csv
 import datetime
 import itertools
@@ -150,9 +201,14 @@ from ndlib.viz.mpl.DiffusionPrevalence import DiffusionPrevalence
 from measures import * 
 from language import *
 
+import cache
+import checkpoint
 import evaluate
+import fingerprint
+import parallel
 import sgp
 import snetwork
+import steady
 
 ###########
 # PARAMS  #
@@ -201,6 +257,10 @@ TRI_P = 0.66
 ITERATIONS = 98
 MEASURE_EVERY = 7
 MITIGATIONS_PER_MEASURE = 30
+
+# Where to cache the static graph measures (None means do not cache)
+MEASURES_DIRECTORY = './measures/'
+
 ROLLOVER = False
 USE_ALL = False
 
@@ -209,26 +269,94 @@ DYNAMIC = True
 ADD_p = 0.01
 REMOVE_p = 0.01
 
+# Keep the static measures up to date as the graph changes
+# Global measures (pagerank, distances, etc.) are recalculated once they are STALENESS days old
+UPDATE_MEASURES = False
+STALENESS = 14
+
+# Compile trees to vectorized functions (score all candidate nodes at once)
+VECTORIZED = False
+
+# Number of processes to evaluate the population with (1 means no pool)
+PROCESSES = parallel.get_processes()
+
+# Fitness cache, number of samples to keep for each tree (0 means no cache, evaluate everyone every time)
+CACHE_SAMPLES = 0
+
+# Trees that behave the same on a sample of feature rows share one simulation (and cache entry)
+FINGERPRINT = False
+FINGERPRINT_STATES = 1024
+
+# Common random numbers, everyone in a generation gets the same initial infected and random numbers
+# The seed is CRN_SEED + the generation
+CRN = False
+CRN_SEED = 0
+
+# Selection, 'tournament' (lexicographic on the fitness values, with elitism)
+# or 'nsga2'/'nsga3' for multi objective selection, survivors are picked from the parents and offspring by Pareto rank
+# NSGA evaluates the parents again every generation too (twice the evaluations)
+# NSGA only works with generations (not STEADY_STATE)
+SELECTION = 'tournament'
+
+# Asynchronous steady state, no generations (workers do not wait for each other)
+# Not with CRN, CACHE_SAMPLES, FINGERPRINT or NSGA SELECTION
+# IN_FLIGHT offspring are always being evaluated, each one replaces the worst of REPLACE_SIZE random individuals
+# Same number of evaluations as the generational loop
+STEADY_STATE = False
+IN_FLIGHT = 2 * PROCESSES
+REPLACE_SIZE = 2
+
+# Steady state evaluates every offspring straight on the pool (no generations to seed, cache, fingerprint or pick survivors from)
+if STEADY_STATE and (CRN or CACHE_SAMPLES > 0 or FINGERPRINT or SELECTION != 'tournament'):
+    raise ValueError('STEADY_STATE does not work with CRN, CACHE_SAMPLES, FINGERPRINT or NSGA SELECTION, turn them off')
+
+# Save the population, logbook, fitness cache and random states every CHECKPOINT_EVERY generations (0 means never)
+# One checkpoint per SLURM array task
+CHECKPOINT_EVERY = 10
+CHECKPOINT_PATH = os.path.join(RESULTS_DIRECTORY, 'checkpoint_' + os.environ.get('SLURM_ARRAY_TASK_ID', '0') + '.pkl')
+
 ###########
 
+parser = argparse.ArgumentParser()
+parser.add_argument('--resume', nargs='?', const=CHECKPOINT_PATH, default=None, help='carry on from a checkpoint (default ' + CHECKPOINT_PATH + ')')
+args = parser.parse_args()
+
 
 # How to evaluate the whole population 
 # Calls stuff from evaluate 
-def evaluate_population(pop):
-    # Only worry about individuals with INVALID fitness values
-    # This will save some time
-    #invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-    #fitnesses = list(map(toolbox.evaluate, invalid_ind))
-    compiled_pop = list(map(toolbox.compile, pop))
-    fitnesses = list(map(toolbox.evaluate, compiled_pop))
-    #for ind, fit in zip(invalid_ind, fitnesses):
+def evaluate_population(pop, gen):
+    trees = [str(ind) for ind in pop]
+
+    # Common random numbers for this generation
+    extra = {'seed': CRN_SEED + gen} if CRN else {}
+
+    # Behaviourally identical trees get the same key
+    if FINGERPRINT:
+        keys = [fingerprint.fingerprint(toolbox.compile_vectorized(ind), fingerprint_sample) for ind in pop]
+    else:
+        keys = trees
+    # One tree to actually evaluate for each key
+    key_tree = dict(zip(keys, trees))
+
+    if CACHE_SAMPLES > 0:
+        # With common random numbers older samples were from a different outbreak
+        if CRN:
+            fitness_cache.clear()
+        # Only evaluate the trees that are missing samples
+        to_evaluate = fitness_cache.missing(keys)
+        fitness_cache.update(to_evaluate, parallel.evaluate_trees(pool, [key_tree[key] for key in to_evaluate], **extra))
+        fitnesses = [fitness_cache[key] for key in keys]
+    elif FINGERPRINT:
+        key_fitness = dict(zip(key_tree, parallel.evaluate_trees(pool, list(key_tree.values()), **extra)))
+        fitnesses = [key_fitness[key] for key in keys]
+    else:
+        # Only the trees (as strings) go to the workers, the fitnesses come back
+        fitnesses = parallel.evaluate_trees(pool, trees, **extra)
+
     for ind, fit in zip(pop, fitnesses):
-        # DO NOT FORGET TO UNPACK THE DICTS WITH TEENDS AND WHATNOT!!!!!
-        final_susceptible, max_infected, total_infected, final_removed = evaluate.convert_iterations(fit[0], model)
-        total_mitigations, effective_mitigations, ineffective_mitigations = evaluate.convert_iterations_mitigations(fit[1])
         #ind.fitness.values = (final_susceptible, total_mitigations, max_infected, total_infected, )
         #ind.fitness.values = (final_susceptible, )
-        ind.fitness.values = (max_infected, total_infected, )
+        ind.fitness.values = fit
 
 
 ##################
@@ -248,61 +376,121 @@ model = snetwork.setup_network(size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_
 
 
 # Identify Static Whole Graph Measures
-travelers = get_travelers(model)
-average_degree = get_average_degree(model)
-shortest_distances = get_shortest_distances_all_nodes(model)
-average_distance = get_avg_distances_all_nodes(model)
-
-# Phase PCG Phase 2 add
-vertex_average_distance = get_node_avg_distances_all_nodes(model)
-minimal_vertex_cover = get_min_vertex_cover(model)
-number_shortest_paths = get_node_number_shortest_paths(model)
-page_rank = get_all_page_rank(model)
-cluster_coef = clustering_coefficient(model)
+graph_measures = GraphMeasures(model, cache_directory=MEASURES_DIRECTORY)
 
 ############
 # GP Setup #
 ############
 
-toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, m=model, traveler_set=travelers, mvc_set=minimal_vertex_cover, vert_avg_dist=vertex_average_distance, number_vertex_shortest=number_shortest_paths, Page_Rank=page_rank, Cluster_Coeff=cluster_coef, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL, use_dynamic=DYNAMIC, ADD_p=ADD_p, REMOVE_p=REMOVE_p)
+evaluation_params = dict(m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL, use_dynamic=DYNAMIC, ADD_p=ADD_p, REMOVE_p=REMOVE_p, update_measures=UPDATE_MEASURES, staleness=STALENESS)
+
+toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, selection=SELECTION, vectorized=VECTORIZED, **evaluation_params)
+
+# Workers get the model and measures once, here
+pool = parallel.setup_pool(PROCESSES, language, evaluate.evaluate_individual, vectorized=VECTORIZED, **evaluation_params)
+
+fitness_cache = cache.FitnessCache(samples=CACHE_SAMPLES)
+
+if FINGERPRINT:
+    fingerprint_sample = fingerprint.get_fingerprint_sample(states=FINGERPRINT_STATES, **evaluation_params)
 
 
 #######################
 # Evolutionary Search #
 #######################
 
-population = toolbox.population(n=POPULATION)
+if args.resume is not None:
+    # Also sets the random states back
+    state = checkpoint.load_checkpoint(args.resume)
+    population = state['population']
+    logbook = state['logbook']
+    fitness_cache = state['fitness_cache']
+    parents = state['parents']
+    pareto_front = state['pareto_front']
+    start = state['generation']
+    print('Resuming from generation', start)
+else:
+    population = toolbox.population(n=POPULATION)
+    start = 0
 
-print('Starting Evolution')
-for g in range(GENERATIONS):
+    # Survivors of the last generation (NSGA)
+    parents = []
 
-    if g % (0.1 * GENERATIONS) == 0:
-        print(g/GENERATIONS)
+    # Non dominated individuals of everything evaluated so far
+    pareto_front = tools.ParetoFront()
 
-    evaluate_population(population)
-    record = mstats.compile(population)
-    logbook.record(gen=g, **record)
+checkpointer = checkpoint.Checkpointer(CHECKPOINT_PATH, every=CHECKPOINT_EVERY)
+
+print('Starting Evolution')
+if STEADY_STATE:
+    # The initial population, then offspring go in one at a time as they are evaluated
+    # Generation g of the logbook is after g * POPULATION offspring
+    evaluate_population(population, start)
+    if args.resume is None:
+        logbook.record(gen=start, **mstats.compile(population))
+
+    def steady_checkpoint(g):
+        pareto_front.update(population)
+        if checkpointer.due(g):
+            checkpointer.save(dict(population=population, logbook=logbook, fitness_cache=fitness_cache, parents=parents, pareto_front=pareto_front, generation=g))
+
+    steady.evolve(pool, toolbox, population, (GENERATIONS - start - 1) * POPULATION, CROSSOVER, MUTATION, in_flight=IN_FLIGHT, replace_size=REPLACE_SIZE, mstats=mstats, logbook=logbook, gen=start, callback=steady_checkpoint)
+
+else:
+    for g in range(start, GENERATIONS):
+
+        # Everything needed to start generation g again
+        if g > start and checkpointer.due(g):
+            checkpointer.save(dict(population=population, logbook=logbook, fitness_cache=fitness_cache, parents=parents, pareto_front=pareto_front, generation=g))
+
+        if g % (0.1 * GENERATIONS) == 0:
+            print(g/GENERATIONS)
+
+        # Parents (NSGA) are evaluated again with their offspring, so everyone is ranked on the same outbreak (CRN) and draw
+        population[:] = parents + population
+        evaluate_population(population, g)
+        pareto_front.update(population)
+
+        # Survivors of the parents and offspring (NSGA-II/III)
+        if SELECTION != 'tournament':
+            population[:] = toolbox.survive(population, POPULATION)
+
+        record = mstats.compile(population)
+        logbook.record(gen=g, **record)
+
+        # Parents (already survivors, so no elitism needed) and their offspring
+        if SELECTION != 'tournament':
+            parents = population[:]
+            offspring_clone = list(map(toolbox.clone, toolbox.select(population, len(population))))
+            population[:] = algorithms.varAnd(offspring_clone, toolbox, CROSSOVER, MUTATION)
+            continue
     
-    # Elitism
-    best = toolbox.elitism(population)  # For elitism
-    best_clone = toolbox.clone(best)
+        # Elitism
+        best = toolbox.elitism(population)  # For elitism
+        best_clone = toolbox.clone(best)
     
-    # Selection
-    offspring = toolbox.select(population, len(population)-1)   # For elitism
-    #offspring = toolbox.select(population, len(population))    # for NOT elitism
-    offspring_clone = list(map(toolbox.clone, offspring))
+        # Selection
+        offspring = toolbox.select(population, len(population)-1)   # For elitism
+        #offspring = toolbox.select(population, len(population))    # for NOT elitism
+        offspring_clone = list(map(toolbox.clone, offspring))
         
-    # Simplified genetic operators 
-    new_population = algorithms.varAnd(offspring_clone, toolbox, CROSSOVER, MUTATION)
+        # Simplified genetic operators 
+        new_population = algorithms.varAnd(offspring_clone, toolbox, CROSSOVER, MUTATION)
 
-    # replace the population with the new population
-    population[:] = best_clone + new_population        # For elitism
-    #population[:] = new_population                     # for NOT elitism
+        # replace the population with the new population
+        population[:] = best_clone + new_population        # For elitism
+        #population[:] = new_population                     # for NOT elitism
 
     
 print('Ending Evolution')
 
-evaluate_population(population)
+checkpointer.close()
+
+population[:] = parents + population
+evaluate_population(population, GENERATIONS)
+pareto_front.update(population)
+if SELECTION != 'tournament' and not STEADY_STATE:
+    population[:] = toolbox.survive(population, POPULATION)
 record = mstats.compile(population)
 logbook.record(gen=GENERATIONS, **record)
 
@@ -313,13 +501,19 @@ logbook.chapters["size"].header = "min", "avg", "max"
 
 print(logbook)
 
+if pool is not None:
+    pool.close()
+    pool.join()
+
 
 ################
 # Save Results #
 ################
 
 print('Saving Results')
-results = dict(population=population, logbook=logbook)
+# NOTE: pareto_front is every individual that was ever non dominated, each on the fitness of ONE (stochastic) evaluation
+#       Lucky outbreaks (died out early) stay in it, so evaluate it again (eg. on the validation graphs) before trusting it
+results = dict(population=population, logbook=logbook, pareto_front=list(pareto_front))
 pickle.dump(results, open(os.path.join(RESULTS_DIRECTORY, datetime.datetime.now().strftime("%m-%d-%Y_%H-%M-%S") + '.pkl'),'wb'))
 
 # plot difftrend so it doesn't crash because of SCOOP
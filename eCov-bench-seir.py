@@ -0,0 +1,131 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.3
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+
+    0.2 (October 18, 2026):
+        - Also runs the native model with ndlib's E -> I rule (latent='probability'), which should agree with ndlib
+
+    0.3 (October 18, 2026):
+        - 'probability' is the native default now, 'native period' is the (different) latent period model
+
+End Change Log
+
+Benchmark the native SEIR model (seir) against ndlib's SEIRModel.
+
+For each graph type (PCG, BA, ER, NWS) the same graph is given to both models and we time
+- Just the epidemic (ITERATIONS days, no mitigation)
+- A full evaluate_individual with a simple strategy
+
+Summary numbers (max infected, total infected) are printed so we can eyeball that they agree.
+
+NOTE: Newer versions of ndlib treat alpha as a probability, not the latent period, so
+      ndlib agrees with 'native probability' (the default, see seir), not 'native period'.
+
+'''
+
+###########
+# Imports #
+###########
+
+import numpy as np
+import time
+
+from measures import *
+
+import evaluate
+import snetwork
+import strategies
+
+###########
+# PARAMS  #
+###########
+
+BETA = 0.09            # Spread Probability (25% works for Wendy graph)
+GAMMA = 0.133           # Removal Probability. Based on 7 day, from sources
+ALPHA = 6.4             # Latent period. Based on 6.4 days, from sources
+INFECTED_0 = 0.02
+GRAPH_SIZE = 500
+
+# For ER graph
+EDGE_p = 0.016
+
+# For NWS graph
+KNN = 10
+REWIRE_p = 0.20
+DROP = 1000
+
+# for BA graph
+M = 4
+
+# For PCG (Powerlaw Cluster Graph)
+N_EDGES = 4
+TRI_P = 0.66
+
+ITERATIONS = 98
+MEASURE_EVERY = 7
+MITIGATIONS_PER_MEASURE = 30
+
+REPEATS = 20
+FUNCTION = strategies.mitigation_degree8
+
+###########
+
+
+# Time running just the epidemic
+def time_epidemic(model):
+    results = []
+    start = time.time()
+    for _ in range(REPEATS):
+        model.reset()
+        iterations = model.iteration_bunch(ITERATIONS)
+        results.append(evaluate.convert_iterations(iterations, model))
+    return (time.time() - start)/REPEATS, np.average(results, axis=0)
+
+# Time a full evaluation with mitigation
+def time_evaluation(model, travelers, average_degree):
+    results = []
+    start = time.time()
+    for _ in range(REPEATS):
+        iterations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, traveler_set=travelers, avg_degree=average_degree, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE)
+        results.append(evaluate.convert_iterations(iterations, model))
+    return (time.time() - start)/REPEATS, np.average(results, axis=0)
+
+
+#############
+# Benchmark #
+#############
+
+graphs = {}
+graphs['PCG'] = dict(size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_P)
+graphs['BA'] = dict(size=GRAPH_SIZE, m=M)
+graphs['ER'] = dict(size=GRAPH_SIZE, edge_p=EDGE_p)
+graphs['NWS'] = dict(size=GRAPH_SIZE, rewire_p=REWIRE_p, knn=KNN, drop=DROP)
+
+for graph_type, graph_params in graphs.items():
+
+    # Make the graph once and give it to both models
+    model = snetwork.setup_network(alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0, **graph_params)
+    g = model.graph.graph
+    travelers = get_travelers(model)
+    average_degree = get_average_degree(model)
+
+    print()
+    print(graph_type, '\t', g.number_of_nodes(), 'nodes\t', g.number_of_edges(), 'edges')
+    print('\t\t\tsec/run\t\tsus, max_inf, tot_inf, rem')
+
+    for native, latent in [(False, None), (True, 'period'), (True, 'probability')]:
+        model = snetwork.setup_network(alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0, graph=g, native=native, latent=latent)
+        name = ('native ' + latent) if native else 'ndlib'
+
+        t, r = time_epidemic(model)
+        print(name, 'epidemic\t', round(t, 4), '\t', np.round(r, 1))
+
+        t, r = time_evaluation(model, travelers, average_degree)
+        print(name, 'evaluate\t', round(t, 4), '\t', np.round(r, 1))
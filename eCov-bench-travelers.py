@@ -0,0 +1,79 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.1
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+
+End Change Log
+
+Benchmark traveler detection.
+
+For PCG graphs of a few sizes, time
+- Finding the communities (greedy modularity, both versions need this, and louvain)
+- The community boundary version (get_travelers), any edge leaving and most edges leaving
+- The minimum edge cut version (get_travelers(mincut=True))
+
+and print how many travelers each finds and how many they have in common.
+
+'''
+
+###########
+# Imports #
+###########
+
+import numpy as np
+import time
+
+from measures import *
+
+import snetwork
+
+###########
+# PARAMS  #
+###########
+
+BETA = 0.09            # Spread Probability (25% works for Wendy graph)
+GAMMA = 0.133           # Removal Probability. Based on 7 day, from sources
+ALPHA = 6.4             # Latent period. Based on 6.4 days, from sources
+INFECTED_0 = 0.02
+
+# For PCG (Powerlaw Cluster Graph)
+GRAPH_SIZES = [250, 500, 1000]
+N_EDGES = 4
+TRI_P = 0.66
+
+REPEATS = 3
+
+###########
+
+
+# Average time (seconds) of f(model) and what it returned the last time
+def time_function(f, model):
+    start = time.time()
+    for _ in range(REPEATS):
+        result = f(model)
+    return (time.time() - start)/REPEATS, result
+
+
+#############
+# Benchmark #
+#############
+
+print('size\tcommunities\tcommunity (s)\tlouvain (s)\tboundary (s)\tmincut (s)\tany #\tmost #\tmincut #\tmost & mincut #')
+
+for size in GRAPH_SIZES:
+
+    model = snetwork.setup_network(size=size, n_edges=N_EDGES, triangle_p=TRI_P, alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
+
+    t_communities, communities = time_function(lambda m: get_communities(m), model)
+    t_louvain, _ = time_function(lambda m: get_communities(m, louvain=True), model)
+    t_boundary, boundary = time_function(lambda m: get_travelers(m), model)
+    boundary_any = get_travelers(model, min_fraction=0)
+    t_mincut, mincut = time_function(lambda m: get_travelers(m, mincut=True), model)
+
+    print(size, len(communities), round(t_communities, 4), round(t_louvain, 4), round(t_boundary, 4), round(t_mincut, 4), len(boundary_any), len(boundary), len(mincut), len(boundary & mincut), sep='\t')
@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       November 23, 2020
 
-Version:    0.3
+Version:    0.8
 
 Change Log:
     0.1 (November 23, 2020): 
@@ -18,6 +18,21 @@ Change Log:
         - Turns out the randomless really will be important
             * Remember, I wanna' know how good they are in general, not how good they are on the same 10 graphs
             
+    0.4 (October 18, 2026):
+        - Distance matrix (one BFS per node) calculated once and used for all the distance measures
+
+    0.5 (October 18, 2026):
+        - Static graph measures come from a GraphMeasures object (cached on disk by graph hash in MEASURES_DIRECTORY)
+
+    0.6 (October 18, 2026):
+        - RACING flag to race the population over the graphs (racing), dropping clearly worse candidates early
+
+    0.7 (October 18, 2026):
+        - ENSEMBLE_GRAPHS to take the graphs (and measures) from a graph ensemble instead of making new ones
+
+    0.8 (October 18, 2026):
+        - MEASURES_DIRECTORY defaults to None, the graphs here are new every time so cached measures were never read again
+
 End Change Log
 
 Since there is such variability in strategy effectivness due to changes in graph topoloty and/or starting conditions, we need to evaluate all models on a number of graphs...
@@ -56,7 +71,9 @@ from measures import *
 from language import *
 
 
+import ensemble
 import evaluate
+import racing
 import sgp
 import snetwork
 
@@ -94,6 +111,16 @@ TRI_P = 0.66
 ITERATIONS = 98
 MEASURE_EVERY = 7
 MITIGATIONS_PER_MEASURE = 30
+
+# Where to cache the static graph measures (None means do not cache)
+# Every evaluation gets a new random graph, so caching them only fills the disk
+MEASURES_DIRECTORY = None
+
+# Pool of pre made graphs (and their measures, ensemble) to take graphs from instead of making new ones
+# 0 means make a new graph every time
+ENSEMBLE_GRAPHS = 0
+ENSEMBLE_DIRECTORY = './ensembles/'
+
 ROLLOVER = False
 USE_ALL = False
 ###########
@@ -101,6 +128,13 @@ USE_ALL = False
 # Graphs to Test on
 N_GRAPHS = 10
 
+# Race the candidates over the graphs (racing) instead of evaluating everyone on all of them
+# Candidates clearly worse than the best are dropped early
+RACING = False
+RACING_KEY = 'tot_inf'          # Measure to race on (lower is better)
+RACING_MIN_GRAPHS = 5           # Graphs everyone gets before anyone can be dropped
+RACING_ALPHA = 0.05             # Dropped if worse than the best with p < RACING_ALPHA (Mann-Whitney U)
+
 
 ##################
 # Epidemic Setup #
@@ -118,22 +152,13 @@ N_GRAPHS = 10
 model = snetwork.setup_network(size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_P, alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
 
 # Identify Static Whole Graph Measures
-travelers = get_travelers(model)
-average_degree = get_average_degree(model)
-shortest_distances = get_shortest_distances_all_nodes(model)
-average_distance = get_avg_distances_all_nodes(model)
-
-vertex_average_distance = get_node_avg_distances_all_nodes(model)
-minimal_vertex_cover = get_min_vertex_cover(model)
-number_shortest_paths = get_node_number_shortest_paths(model)
-page_rank = get_all_page_rank(model)
-cluster_coef = clustering_coefficient(model)
+graph_measures = GraphMeasures(model, cache_directory=MEASURES_DIRECTORY)
 
 ############
 # GP Setup #
 ############
 
-toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, m=model, traveler_set=travelers, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER)
+toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER)
 
 #############
 # File I/O  #
@@ -150,35 +175,32 @@ logbook = results["logbook"]
 # Evaluate on X graphs #
 ########################
 
+# PCG
+if ENSEMBLE_GRAPHS > 0:
+    graph_ensemble = ensemble.GraphEnsemble(ENSEMBLE_DIRECTORY, ENSEMBLE_GRAPHS, size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_P)
+
 # Turn the population into functions to be evaluated
 compiled_pop = list(map(toolbox.compile, population))
 
 # List to hold onto results to be saved
 all_results = []
 
-for i, f in enumerate(compiled_pop):
-#for i in range(5):
-    FUNCTION = f
-    #FUNCTION = compiled_pop[i]
-    print(population[50])
-    # Dict to hold results
-    results = {}
-    results['sus'] = []
-    results['max_inf'] = []
-    results['tot_inf'] = []
-    results['rem'] = []
-    results['tot_mit'] = []
-    results['eff_mit'] = []
-    results['ine_mit'] = []
-
-    for _ in range(N_GRAPHS):
+# Evaluate candidate i on a new graph (j is the graph number, every evaluation gets its own graph)
+def evaluate_candidate(i, j):
+    FUNCTION = compiled_pop[i]
+
+    # Take a graph from the ensemble
+    if ENSEMBLE_GRAPHS > 0:
+        model, graph_measures = graph_ensemble.sample_model(alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
+        GRAPH_TYPE = "PCG"
 
+    else:
         #model = snetwork.setup_network(directory=GRAPH_DIRECTORY, name=GRAPH_NAME, size=GRAPH_SIZE, alpha=ALPHA, drop=DROP, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
-                    
+                
         # ER
         #model = snetwork.setup_network(directory=GRAPH_DIRECTORY, name=GRAPH_NAME, size=GRAPH_SIZE, edge_p=EDGE_p, alpha=ALPHA, drop=DROP, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
         #GRAPH_TYPE = "ER"
-                   
+               
         # NWS
         #model = snetwork.setup_network(directory=GRAPH_DIRECTORY, name=GRAPH_NAME, size=GRAPH_SIZE, rewire_p=REWIRE_p, knn=KNN, alpha=ALPHA, drop=DROP, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
         #GRAPH_TYPE = "NWS"
@@ -192,34 +214,28 @@ for i, f in enumerate(compiled_pop):
         GRAPH_TYPE = "PCG"
 
         # Identify Static Whole Graph Measures
-        travelers = get_travelers(model)
-        average_degree = get_average_degree(model)
-        shortest_distances = get_shortest_distances_all_nodes(model)
-        average_distance = get_avg_distances_all_nodes(model)
-
-        # Phase PCG Phase 2 add
-        vertex_average_distance = get_node_avg_distances_all_nodes(model)
-        minimal_vertex_cover = get_min_vertex_cover(model)
-        number_shortest_paths = get_node_number_shortest_paths(model)
-        page_rank = get_all_page_rank(model)
-        cluster_coef = clustering_coefficient(model)
-
-        terations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, traveler_set=travelers, mvc_set=minimal_vertex_cover, vert_avg_dist=vertex_average_distance, number_vertex_shortest=number_shortest_paths, Page_Rank=page_rank, Cluster_Coeff=cluster_coef, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
-
-        final_susceptible, max_infected, total_infected, final_removed = evaluate.convert_iterations(terations, model)
-        total_mitigations, effective_mitigations, ineffective_mitigations = evaluate.convert_iterations_mitigations(iterations_mitigations)
-
-        results['sus'].append(final_susceptible)
-        results['max_inf'].append(max_infected)
-        results['tot_inf'].append(total_infected)
-        results['rem'].append(final_removed)
-        results['tot_mit'].append(total_mitigations)
-        results['eff_mit'].append(effective_mitigations)
-        results['ine_mit'].append(ineffective_mitigations)
-        
-
-
-    all_results.append(results)
+        graph_measures = GraphMeasures(model, cache_directory=MEASURES_DIRECTORY)
+
+    terations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
+
+    return racing.get_results(terations, iterations_mitigations, model)
+
+
+if RACING:
+    all_results, finalists = racing.race(len(compiled_pop), N_GRAPHS, evaluate_candidate, key=RACING_KEY, min_instances=RACING_MIN_GRAPHS, alpha=RACING_ALPHA)
+    print('Finalists:', finalists)
+    print('Evaluations:', racing.count_evaluations(all_results), 'of', len(compiled_pop) * N_GRAPHS)
+
+else:
+    for i in range(len(compiled_pop)):
+        print(population[50])
+        # Dict to hold results
+        results = racing.new_results()
+
+        for j in range(N_GRAPHS):
+            racing.add_results(results, evaluate_candidate(i, j))
+
+        all_results.append(results)
 
 
 
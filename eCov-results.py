@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       May 22, 2020
 
-Version:    0.16
+Version:    0.18
 
 Change Log:
     0.1: 
@@ -61,6 +61,12 @@ Change Log:
     0.16 (January 11, 2021):
         - Changed such that it will iterate over all relevant files in a specificed directory
 
+    0.17 (October 18, 2026):
+        - Distance matrix (one BFS per node) calculated once and used for all the distance measures
+
+    0.18 (October 18, 2026):
+        - Static graph measures come from a GraphMeasures object (cached on disk by graph hash in MEASURES_DIRECTORY)
+
 End Change Log
 
 '''
@@ -213,7 +219,7 @@ def no_mit(a,b,c,d,e,f):
     return False
 
 def diffusion_trend(ind):
-    iterations, iterations_mitigations = evaluate.evaluate_individual(toolbox.compile(ind), m=model, traveler_set=travelers, mvc_set=minimal_vertex_cover, vert_avg_dist=vertex_average_distance, number_vertex_shortest=number_shortest_paths, Page_Rank=page_rank, Cluster_Coeff=cluster_coef, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
+    iterations, iterations_mitigations = evaluate.evaluate_individual(toolbox.compile(ind), m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
     trends = model.build_trends(iterations)
     # Visualization
     viz = DiffusionTrend(model, trends)
@@ -283,6 +289,10 @@ TRI_P = 0.66
 ITERATIONS = 140        
 MEASURE_EVERY = 7
 MITIGATIONS_PER_MEASURE = 20
+
+# Where to cache the static graph measures (None means do not cache)
+MEASURES_DIRECTORY = './measures/'
+
 ROLLOVER = False
 USE_ALL = False
 ##################
@@ -301,22 +311,13 @@ USE_ALL = False
 model = snetwork.setup_network(size=GRAPH_SIZE, n_edges=N_EDGES, triangle_p=TRI_P, alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
 
 # Identify Static Whole Graph Measures
-travelers = get_travelers(model)
-average_degree = get_average_degree(model)
-shortest_distances = get_shortest_distances_all_nodes(model)
-average_distance = get_avg_distances_all_nodes(model)
-
-vertex_average_distance = get_node_avg_distances_all_nodes(model)
-minimal_vertex_cover = get_min_vertex_cover(model)
-number_shortest_paths = get_node_number_shortest_paths(model)
-page_rank = get_all_page_rank(model)
-cluster_coef = clustering_coefficient(model)
+graph_measures = GraphMeasures(model, cache_directory=MEASURES_DIRECTORY)
 
 ############
 # GP Setup #
 ############
 
-toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, m=model, traveler_set=travelers, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER)
+toolbox, mstats, logbook = sgp.setup_gp(language, evaluate.evaluate_individual, m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER)
 
 #############
 # File I/O  #
@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       June 12, 2020
 
-Version:    0.5
+Version:    0.8
 
 
 Change Log:
@@ -27,6 +27,15 @@ Change Log:
     0.5 (November 3, 2020):
         - Added functions to test the 'break' results
 
+    0.6 (October 18, 2026):
+        - Load columnar trajectories (.npz, trajectories) when there are any, measures/trends come straight from the arrays
+
+    0.7 (October 18, 2026):
+        - Tables get the measures from a results catalog (catalog), calculated once per results file and cached on disk
+
+    0.8 (October 18, 2026):
+        - Warn when a table compares results made with different traveler definitions (catalog)
+
 End Change Log
 
 Functions to generate statistics on the functions that have been tested. 
@@ -58,8 +67,10 @@ import pickle
 import scipy
 import scipy.stats
 
+import catalog
 import evaluate
 import snetwork
+import trajectories
 
 ###########
 # PARAMS  #
@@ -271,12 +282,22 @@ STATUS_MITIGATED = 4
 
 ###########
 
-# Load the data from the pickle
+# Load the data, columnar trajectories (npz) if there are any, otherwise the pickle
 def load_data(f_name):
+    if os.path.exists(os.path.join(RESULTS_DIRECTORY, f_name + ".npz")):
+        return trajectories.load_trajectories(os.path.join(RESULTS_DIRECTORY, f_name + ".npz"))
     return pickle.load(open(os.path.join(RESULTS_DIRECTORY, f_name + ".pkl"), 'rb'))
 
+# Measures of a results file (same as get_single_measures(load_data(f_name), m))
+# From the catalog, so they are only calculated again if the file changed
+def get_measures(f_name):
+    return results_catalog.get_measures(f_name)
+
 # get the trends for all data
 def get_all_trends(results, m):
+    if isinstance(results, dict):
+        return trajectories.get_all_trends(results)
+
     iterations = results[0]
     mitigations = results[1]
 
@@ -356,6 +377,9 @@ def average_epidemic_plot(results, fName, mitigate_period=7):
 
 # Extract Relevant Data for Summary Stats
 def get_single_measures(results, m):
+    if isinstance(results, dict):
+        return trajectories.get_single_measures(results)
+
     iterations = results[0]
     mitigations = results[1]
 
@@ -408,11 +432,10 @@ def get_function_summary_statistics(measures, measure_keys):
 # summary statistics table
 def generate_summary_statistic_table(functions, model, measure_keys):
     s = ''
+    results_catalog.check_traveler_definitions(functions)
 
     for f in range(len(functions)):
-        data = load_data(functions[f])
-
-        measures = get_single_measures(data, model)
+        measures = get_measures(functions[f])
         s += functions[f]
         s += get_function_summary_statistics(measures, measure_keys)
 
@@ -436,13 +459,11 @@ def compare_distros_p_vals(measures1, measures2, measure_keys):
 # p-val statistics table
 def generate_p_val_table(static, dynamic, model, measure_keys):
     s = ''
+    results_catalog.check_traveler_definitions(list(static) + list(dynamic))
 
     for f in range(len(static)):
-        data_s = load_data(static[f])
-        data_d = load_data(dynamic[f])
-
-        measures_s = get_single_measures(data_s, model)
-        measures_d = get_single_measures(data_d, model)
+        measures_s = get_measures(static[f])
+        measures_d = get_measures(dynamic[f])
 
         s += compare_distros_p_vals(measures_s, measures_d, measure_keys)
 
@@ -452,9 +473,10 @@ def generate_p_val_table(static, dynamic, model, measure_keys):
 def generate_p_val_matrix(functions, function_names, indices, measure, measure_key, model):
     
     # Get relevant info
+    results_catalog.check_traveler_definitions([functions[ind] for ind in indices])
     f_data = []
     for ind in indices:
-        f_data.append(get_single_measures(load_data(functions[ind]), model))
+        f_data.append(get_measures(functions[ind]))
 
 
     # Generate p-val matrix
@@ -520,10 +542,8 @@ def break_function(mitigation, graph, static, values, key):
     medians = []
     iqrs = []
     for v in values:
-        # Load data
-        data = load_data(mitigation + '_' + graph + '_' + str(v) + '_' + str(static))
-        # Format the data nice
-        measures = get_single_measures(data, model)
+        # Load data (formatted nice)
+        measures = get_measures(mitigation + '_' + graph + '_' + str(v) + '_' + str(static))
         medians.append(np.median(measures[key]))
         iqrs.append(scipy.stats.iqr(measures[key])/2)
 
@@ -1493,6 +1513,9 @@ RESULTS_DIRECTORY = "./function_tests_use_all/"
 #RESULTS_DIRECTORY = "./function_tests_grow/"
 #RESULTS_DIRECTORY = "./function_tests_use_all_grow/"
 
+# Measures of every results file, cached in RESULTS_DIRECTORY/catalog/
+results_catalog = catalog.ResultsCatalog(RESULTS_DIRECTORY)
+
 
 model = snetwork.setup_network(0,0,0,0, size=500, edge_p=0.04)
 
@@ -2,13 +2,39 @@
 Author:     James Hughes
 Date:       November 4, 2020
 
-Version:    0.1
+Version:    0.9
 
 
 Change Log:
     0.1 (November 4, 2020): 
         - Initial version.
 
+    0.2 (October 18, 2026):
+        - BATCH flag: with a static topology all N replicates are run together (evaluate.evaluate_batch)
+
+    0.3 (October 18, 2026):
+        - Distance matrix (one BFS per node) calculated once and used for all the distance measures
+
+    0.4 (October 18, 2026):
+        - Static graph measures come from a GraphMeasures object (cached on disk by graph hash in MEASURES_DIRECTORY)
+
+    0.5 (October 18, 2026):
+        - ENSEMBLE_GRAPHS to take the graphs (and measures) from a graph ensemble instead of making new ones
+
+    0.6 (October 18, 2026):
+        - TRAJECTORIES flag to save the results as columnar trajectories (npz, trajectories) instead of a pickle
+
+    0.7 (October 18, 2026):
+        - BATCH off by default and only used with the native model (seir.SEIRModel)
+            * The batch model uses the native latent period rule, ndlib's SEIRModel does not, so static and dynamic runs were different disease models
+
+    0.8 (October 18, 2026):
+        - BATCH works with ndlib models again (no native only check, it could never be true here)
+            * A batch made from an ndlib model uses ndlib's E -> I rule (seir), so static and dynamic runs are the same disease model
+
+    0.9 (October 18, 2026):
+        - Results are saved with the traveler definition (measures.TRAVELER_DEFINITION) so the stats can tell them apart
+
 End Change Log
 
 Similar to eCov-test & -test-break, but this one will keep going and increase the number of verticies in the graph.
@@ -27,9 +53,11 @@ import pickle
 
 from measures import * 
 
+import ensemble
 import evaluate
 import snetwork
 import strategies
+import trajectories
 
 
 ###########
@@ -75,6 +103,15 @@ TRI_P = 0.66
 ITERATIONS = 98
 MEASURE_EVERY = 7
 MITIGATIONS_PER_MEASURE = 30
+
+# Where to cache the static graph measures (None means do not cache)
+MEASURES_DIRECTORY = None
+
+# Pool of pre made graphs (and their measures, ensemble) to take graphs from instead of making new ones
+# 0 means make a new graph every time
+ENSEMBLE_GRAPHS = 0
+ENSEMBLE_DIRECTORY = './ensembles/'
+
 ROLLOVER = False
 #USE_ALL = False              ###########
 USE_ALL = True              ###########
@@ -84,6 +121,9 @@ USE_ALL = True              ###########
 OUTPUT_DIRECTORY = "./function_tests_use_all_grow/"
 #OUTPUT_DIRECTORY = "./function_tests_grow/"
 N = 100
+BATCH = False               # Run all replicates at once when the topology does not change (same disease model as the model it is made from, see seir)
+TRAJECTORIES = True         # Save the results as columnar trajectories (npz) instead of pickled iteration dicts
+EVENTS = False              # Keep every node's status changes in the trajectories too
 CHANGE_TOPOLOGY = True                     # CHANGE ME FOR STATIC/DYNAMIC
 #FUNCTION = strategies.mitigation_degree5       # CHANGE ME FOR SWITCHING OUT FUNCTIONS
 
@@ -110,6 +150,10 @@ increases = [GRAPH_SIZE]
 
 
 for value in increases:
+
+    # PCG
+    if ENSEMBLE_GRAPHS > 0:
+        graph_ensemble = ensemble.GraphEnsemble(ENSEMBLE_DIRECTORY, ENSEMBLE_GRAPHS, size=value, n_edges=N_EDGES, triangle_p=TRI_P)
    
     for topology in [False, True]:
         CHANGE_TOPOLOGY = topology
@@ -137,7 +181,12 @@ for value in increases:
                     print(i/N)
 
                 # If this is the first run OR we want to change the topology all the time
-                if i == 0 or CHANGE_TOPOLOGY:
+                # Take a graph from the ensemble
+                if (i == 0 or CHANGE_TOPOLOGY) and ENSEMBLE_GRAPHS > 0:
+                    model, graph_measures = graph_ensemble.sample_model(alpha=ALPHA, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
+                    GRAPH_TYPE = "PCG"
+
+                elif i == 0 or CHANGE_TOPOLOGY:
                 
                     #model = snetwork.setup_network(directory=GRAPH_DIRECTORY, name=GRAPH_NAME, size=GRAPH_SIZE, alpha=ALPHA, drop=DROP, beta=BETA, gamma=GAMMA, infected=INFECTED_0)
                     
@@ -158,26 +207,25 @@ for value in increases:
                     GRAPH_TYPE = "PCG"
 
                     # Identify Static Whole Graph Measures
-                    travelers = get_travelers(model)
-                    average_degree = get_average_degree(model)
-                    shortest_distances = get_shortest_distances_all_nodes(model)
-                    average_distance = get_avg_distances_all_nodes(model)
+                    graph_measures = GraphMeasures(model, cache_directory=MEASURES_DIRECTORY)
 
-                    # Phase PCG Phase 2 add
-                    vertex_average_distance = get_node_avg_distances_all_nodes(model)
-                    minimal_vertex_cover = get_min_vertex_cover(model)
-                    number_shortest_paths = get_node_number_shortest_paths(model)
-                    page_rank = get_all_page_rank(model)
-                    cluster_coef = clustering_coefficient(model)
 
+                # Static topology, so every replicate is on the same graph
+                # Run all N of them together and we are done
+                if BATCH and not CHANGE_TOPOLOGY:
+                    if FUNCTION.__name__ != "mitigation_none":
+                        all_iterations, all_iterations_mitigations = evaluate.evaluate_batch(FUNCTION, m=model, replicates=N, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
+                    else:
+                        all_iterations, all_iterations_mitigations = evaluate.evaluate_batch(FUNCTION, m=model, replicates=N, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
+                    break
 
                 # Evaluate the function
                 # If we are doing the non mitigation 
                 # we must not do a secondary strategy
                 if FUNCTION.__name__ != "mitigation_none":
-                    iterations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, traveler_set=travelers, mvc_set=minimal_vertex_cover, vert_avg_dist=vertex_average_distance, number_vertex_shortest=number_shortest_paths, Page_Rank=page_rank, Cluster_Coeff=cluster_coef, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
+                    iterations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
                 else:
-                    iterations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, traveler_set=travelers, mvc_set=minimal_vertex_cover, vert_avg_dist=vertex_average_distance, number_vertex_shortest=number_shortest_paths, Page_Rank=page_rank, Cluster_Coeff=cluster_coef, avg_degree=average_degree, short_dist=shortest_distances, avg_dist=average_distance, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
+                    iterations, iterations_mitigations = evaluate.evaluate_individual(FUNCTION, m=model, **graph_measures.as_kwargs(), total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER, use_all=USE_ALL)
                 # Bookkeeping
                 all_iterations.append(iterations)
                 all_iterations_mitigations.append(iterations_mitigations)
@@ -194,7 +242,10 @@ for value in increases:
 
             print('Saving Results')
 
-            pickle.dump((all_iterations, all_iterations_mitigations), open(os.path.join(OUTPUT_DIRECTORY, FUNCTION.__name__ + '_' + GRAPH_TYPE  + '_' + str(value) + '_' + str(CHANGE_TOPOLOGY)+'.pkl'),'wb'))
+            if TRAJECTORIES:
+                trajectories.save_trajectories(os.path.join(OUTPUT_DIRECTORY, FUNCTION.__name__ + '_' + GRAPH_TYPE  + '_' + str(value) + '_' + str(CHANGE_TOPOLOGY) + '.npz'), trajectories.from_iterations(all_iterations, all_iterations_mitigations, events=EVENTS), traveler_definition=TRAVELER_DEFINITION)
+            else:
+                pickle.dump((all_iterations, all_iterations_mitigations), open(os.path.join(OUTPUT_DIRECTORY, FUNCTION.__name__ + '_' + GRAPH_TYPE  + '_' + str(value) + '_' + str(CHANGE_TOPOLOGY)+'.pkl'),'wb'))
 
         # Quick hack to not run true on real graph
         if GRAPH_TYPE == "DB15":
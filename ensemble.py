@@ -0,0 +1,113 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.1
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Pool of pre made graphs (and their static measures) kept on disk
+
+End Change Log
+
+Graph ensembles.
+
+Making a random graph and calculating all its static measures (distances,
+# shortest paths, etc.) takes way longer than a simulation on it. An ensemble
+is K graphs made once with the same generator/parameters (the ones given to
+snetwork.setup_network) and kept in
+
+    <directory>/<generator parameters>/graph_<i>.npz    (number of nodes and edge list)
+    <directory>/<generator parameters>/<hash>.npz       (GraphMeasures of graph i)
+
+Graphs that are not on disk yet are made when the ensemble is created, so the
+first run makes them and every run after that just loads them. Drivers then
+take graphs from the ensemble (in order or sampled) instead of making new ones.
+
+A new model (and networkx graph) is made every time a graph is taken, since
+dynamic graphs get changed during evaluation. The measures are only loaded
+once and shared.
+
+'''
+
+###########
+# Imports #
+###########
+
+import networkx as nx
+import numpy as np
+import os
+import random
+
+from measures import GraphMeasures
+
+import seir
+import snetwork
+
+
+# Directory name for an ensemble, from the graph parameters given
+def get_ensemble_name(**graph_params):
+    return '_'.join(k + '-' + str(v) for k, v in sorted(graph_params.items()) if v is not None)
+
+# Edge list of a graph (nodes must be 0 -- n-1)
+def save_graph(path, g):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, nodes=g.number_of_nodes(), edges=np.array(list(g.edges()), dtype=np.int32).reshape(-1, 2))
+    os.replace(tmp, path)
+
+def load_graph(path):
+    data = np.load(path)
+    g = nx.Graph()
+    g.add_nodes_from(range(int(data['nodes'])))
+    g.add_edges_from(data['edges'].tolist())
+    return g
+
+
+class GraphEnsemble(object):
+
+    # k graphs made with snetwork.make_graph(**graph_params)
+    def __init__(self, directory, k, **graph_params):
+        self.directory = os.path.join(directory, get_ensemble_name(**graph_params))
+        self.k = k
+        self.graph_params = graph_params
+
+        # Graph number -> GraphMeasures (loaded once)
+        self.measures = {}
+
+        self.build()
+
+    def __len__(self):
+        return self.k
+
+    def graph_path(self, i):
+        return os.path.join(self.directory, 'graph_' + str(i) + '.npz')
+
+    # Make (and measure) the graphs that are not on disk yet
+    # Measures are calculated on the graph as it is loaded, so they match what get_model gives
+    def build(self):
+        for i in range(self.k):
+            if os.path.exists(self.graph_path(i)):
+                continue
+            g = snetwork.make_graph(**self.graph_params)
+            g = nx.convert_node_labels_to_integers(g, ordering='sorted')
+            save_graph(self.graph_path(i), g)
+            self.measures[i] = GraphMeasures(seir.SEIRModel(self.get_graph(i)), cache_directory=self.directory)
+
+    # New networkx graph of graph i
+    def get_graph(self, i):
+        return load_graph(self.graph_path(i))
+
+    # New model of graph i (setup_network parameters) and the graph's measures
+    def get_model(self, i, alpha, beta, gamma, infected, native=False):
+        model = snetwork.setup_network(alpha=alpha, beta=beta, gamma=gamma, infected=infected, graph=self.get_graph(i), native=native)
+        if i not in self.measures:
+            self.measures[i] = GraphMeasures(model, cache_directory=self.directory)
+        return model, self.measures[i]
+
+    # Model and measures of a random graph from the ensemble
+    def sample_model(self, alpha, beta, gamma, infected, native=False):
+        return self.get_model(random.randrange(self.k), alpha, beta, gamma, infected, native=native)
@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       June 8, 2020
 
-Version:    0.8
+Version:    0.17
 
 
 Change Log:
@@ -35,6 +35,54 @@ Change Log:
     0.8 (April 26, 2021):
         - Added the option to make the graph dynamic
         - Simply added a few more params: a boolean, and add/remove probs
+
+    0.9 (October 18, 2026):
+        - Node features on measurement days come from a feature matrix built for all candidates at once
+            * CSR adjacency times one-hot status gives every neighbour status count in one product
+            * Rows are handed to the mitigation function, so the function signature is unchanged
+            * Neighbour susexp counts are patched as nodes get mitigated (same as calling per node)
+        - Removed the per node shortest distance to infected calc since it was not being used
+
+    0.10 (October 18, 2026):
+        - Added a vectorized option where f is a compiled vectorized tree (language.compile_vectorized)
+            * f is called once with whole feature columns and returns a mask
+            * Mitigations go to the first true entries in the shuffled order
+            * Neighbour counts are from the start of the measurement day (no patching as we go)
+            * The use all function is still applied one node at a time
+
+    0.11 (October 18, 2026):
+        - Tell the model when the graph changed (dynamic) so the native SEIR model can rebuild its adjacency
+
+    0.12 (October 18, 2026):
+        - Measurement day logic pulled out into mitigation_day so it can be shared
+        - Added evaluate_batch to run many replicates on the same (static) graph together
+            * Uses seir.BatchSEIRModel, so one sparse product per day for all replicates
+            * Mitigation is decided per replicate
+            * Returns lists of iterations/iterations_mitigations like calling evaluate_individual N times
+
+    0.13 (October 18, 2026):
+        - Option (update_measures) to keep the static measures up to date on dynamic graphs (DynamicMeasures)
+            * add_edge/remove_edge tell it about the edges they change
+            * Global measures are recalculated on measurement days once they are staleness days old
+
+    0.14 (October 18, 2026):
+        - remove_edge checks if the edge is a bridge (BridgeIndex) before removing it, instead of a path search after
+
+    0.15 (October 18, 2026):
+        - Dynamic graph changes for a day done by churn
+            * All ADD/REMOVE vertices selected with one np.random.choice (select_group)
+            * Neighbours (and neighbour's neighbours) picked for all of them at once from CSR arrays
+            * Edges are then added/removed one after the other
+
+    0.16 (October 18, 2026):
+        - Option (early_stop, default on) to stop stepping the model once the epidemic is over (no exposed or infected)
+            * The rest of the iterations are made up (extinct_iteration), nothing can change other than mitigations
+            * Mitigation days (and dynamic graph changes) still happen, so the results are the same
+
+    0.17 (October 18, 2026):
+        - Option (seed) for common random numbers, the initial infected and all random numbers come from the seed
+            * Everyone evaluated with the same seed gets the same outbreak
+            * The random state is put back after, so the caller's random numbers are not affected
         
 
 End Change Log
@@ -70,12 +118,51 @@ from ndlib.viz.mpl.DiffusionPrevalence import DiffusionPrevalence
 from measures import * 
 from language import *
 
+import seir
+
 STATUS_SUSCEPTIBLE = 0
 STATUS_EXPOSED = 2
 STATUS_INFECTED = 1
 STATUS_REMOVED = 3
 STATUS_MITIGATED = 4
 
+# Columns of the feature matrix
+# Same order as the arguments of the mitigation functions (and the language)
+FEATURE_DEGREE = 0
+FEATURE_NB_DEGREE = 1
+FEATURE_NB_SUSEXP = 2
+FEATURE_NB_INFECT = 3
+FEATURE_TRAVELER = 4
+FEATURE_MVC = 5
+FEATURE_AVG_DEGREE = 6
+FEATURE_AVG_DIST_ALL = 7
+FEATURE_AVG_DIST_SGL = 8
+FEATURE_NUM_SUSEXP = 9
+FEATURE_NUM_INFECT = 10
+FEATURE_NUM_REMOVE = 11
+FEATURE_NUM_SHORT = 12
+FEATURE_PR = 13
+FEATURE_CCOEF = 14
+NUM_FEATURES = 15
+
+# Boolean columns (stored as 0/1 in the matrix)
+FEATURE_BOOLS = [FEATURE_TRAVELER, FEATURE_MVC]
+
+# Columns used for the regular mitigation function
+FEATURE_COLUMNS = list(range(NUM_FEATURES))
+
+# Columns used for the use all (secondary) function
+USE_ALL_COLUMNS = [FEATURE_DEGREE, 
+                    FEATURE_NB_DEGREE, 
+                    FEATURE_NB_SUSEXP, 
+                    FEATURE_NB_INFECT, 
+                    FEATURE_TRAVELER, 
+                    FEATURE_AVG_DEGREE, 
+                    FEATURE_NUM_SUSEXP, 
+                    FEATURE_NUM_INFECT, 
+                    FEATURE_NUM_REMOVE,
+                    ]
+
 
 
 
@@ -104,7 +191,7 @@ def default_use_all(node_degree,
 ######################
    
 # Fitness Function
-def evaluate_individual(f, m, traveler_set, mvc_set=None, avg_degree=0, avg_dist=0, short_dist={}, vert_avg_dist=None, number_vertex_shortest=None, Page_Rank=None, Cluster_Coeff=None, total_iterations=0, measure_every=0, mitigations_per_measure=0, rollover=False, use_all=False, use_all_function=default_use_all, use_dynamic=False, ADD_p=0.00, REMOVE_p=0.00):
+def evaluate_individual(f, m, traveler_set, mvc_set=None, avg_degree=0, avg_dist=0, short_dist={}, vert_avg_dist=None, number_vertex_shortest=None, Page_Rank=None, Cluster_Coeff=None, total_iterations=0, measure_every=0, mitigations_per_measure=0, rollover=False, use_all=False, use_all_function=default_use_all, use_dynamic=False, ADD_p=0.00, REMOVE_p=0.00, vectorized=False, update_measures=False, staleness=14, early_stop=True, seed=None):
 
     max_infected = 0
     total_infected = 0
@@ -119,174 +206,50 @@ def evaluate_individual(f, m, traveler_set, mvc_set=None, avg_degree=0, avg_dist
     # List to record network changes about mitigation strategies 
     iterations_mitigations = []
 
+    # No exposed or infected left (only with early_stop)
+    extinct = False
+
+    # Common random numbers
+    # Start the outbreak over with the seed (reset picks the initial infected)
+    if seed is not None:
+        random_state = random.getstate()
+        np_random_state = np.random.get_state()
+        random.seed(seed)
+        np.random.seed(seed)
+        m.reset()
+
     if use_dynamic:
         GRAPH_SIZE= m.graph.graph.number_of_nodes()
         ADD = int(GRAPH_SIZE*ADD_p)
         REMOVE = int(GRAPH_SIZE*REMOVE_p)
         probs = [1/GRAPH_SIZE]*GRAPH_SIZE
 
+        # Know which edges can be removed without disconnecting the graph
+        bridges = BridgeIndex(m.graph.graph)
+
+    # Static measures as per node arrays (once per evaluation, not per node)
+    static_features = get_static_features(m, traveler_set, mvc_set, vert_avg_dist, number_vertex_shortest, Page_Rank, Cluster_Coeff)
+
+    # Keep the static measures up to date as the graph changes
+    dynamic_measures = None
+    if use_dynamic and update_measures:
+        dynamic_measures = DynamicMeasures(m, traveler_set, mvc_set, vert_avg_dist, number_vertex_shortest, Page_Rank, Cluster_Coeff, avg_degree, avg_dist, staleness)
+
     for i in range(total_iterations):
 
         # If it is a day we evaluate our network and apply mitigation
         if i != 0 and i % measure_every == 0:
-            # Identify those that are able to hav emitigation applied
-            # Remember, we pretend we do not know that exposed are exposed
-            susceptible = get_all_of_status(m, target_status=STATUS_SUSCEPTIBLE)
-            exposed = get_all_of_status(m, target_status=STATUS_EXPOSED)
-            susexp = susceptible + exposed
-            # Shuffle because we have limited resources and don't want any ordering
-            random.shuffle(susexp)          
-            infected = get_all_of_status(m, target_status=STATUS_INFECTED)
-
-            
-            num_suscept = get_num_nodes(m, STATUS_SUSCEPTIBLE)
-            num_exposed = get_num_nodes(m, target_status=STATUS_EXPOSED)
-            num_susexp = num_suscept + num_exposed
-            num_infected = get_num_nodes(m, target_status=STATUS_INFECTED)
-            num_removed = get_num_nodes(m, target_status=STATUS_REMOVED)
-
-            #print(max_infected, '\t', total_infected, '\t', num_recovered - total_mitigation, '\t', total_mitigation)
-
-            # Track mitigation details
-            mitigations_used = 0
-            mitigations_used_effective = 0
-            mitigations_step = {}
-            mitigations_step['iteration'] = i
-            mitigations_step['status'] = {}
-            mitigations_step['node_count'] = {}
-            mitigations_step['status_delta'] = {}
-            mitigations_step['total_mitigations'] = {}
-
-            # Evaluate nodes
-            # Only consider susceptible and exposed currently
-            # In future, we could consider infected and do neighbour/ring mitigation
-            for s in susexp:
-                
-                if mitigations_available(mitigations_per_measure + rollover_mitigations, mitigations_used):
-                    node_status = get_status(m, s)
-                    node_degree = get_degree(m, s)
-                    avg_neighbour_degree = get_avg_neighbour_degree(m, s)
-                    neighbour_susexp = get_num_neighbour_status(m, s, target_status=STATUS_SUSCEPTIBLE) + get_num_neighbour_status(m, s, target_status=STATUS_EXPOSED)
-                    neighbour_infected = get_num_neighbour_status(m, s, target_status=STATUS_INFECTED) 
-                    #neighbour_removed = get_num_neighbour_status(m, s, target_status=STATUS_REMOVED) 
-                    traveler = is_traveler(traveler_set, s)
-                    num_mitigation = mitigations_available(mitigations_per_measure + rollover_mitigations, mitigations_used)
-                    #mitigation = get_cur_mitigations(mitigations_per_measure + rollover_mitigations, mitigations_used)
-
-                    s_dist_inf = get_shortest_distance(short_dist, s, infected)
-
-                    vertex_avg_dist = get_vertex_average_dist(vert_avg_dist, s)                     # vert_avg_dist
-                    minimal_vertex_cover = is_in_min_cover(mvc_set, s)                              # MVX
-                    num_vert_shortest = get_vertex_num_shortest_paths(number_vertex_shortest, s)    # num_short
-                    page_rank = get_page_rank(Page_Rank, s)                                         # PR
-                    cluster_coefficient =  get_cluster_coefficient(Cluster_Coeff, s)                # CCoef
-
-                    do_we_mitigate = f(
-                                        #node_status,
-                                        node_degree,
-                                        avg_neighbour_degree,
-                                        neighbour_susexp, 
-                                        neighbour_infected,
-                                        #neighbour_removed,
-                                        traveler,
-                                        minimal_vertex_cover,
-                                        avg_degree,
-                                        avg_dist,
-                                        vertex_avg_dist,
-                                        #num_mitigation,
-                                        #mitigation,
-                                        num_susexp,
-                                        num_infected,
-                                        num_removed,
-                                        num_vert_shortest,
-                                        #s_dist_inf,
-                                        page_rank,
-                                        cluster_coefficient,
-                                        #i,
-                                        )
-
-                    if do_we_mitigate:
-                        if node_status == STATUS_SUSCEPTIBLE:
-                            cur_num_mitigated = mitigate_self(m, s)
-                            mitigations_used += cur_num_mitigated
-                            mitigations_used_effective += cur_num_mitigated
-                            mitigations_step['status'][s] = STATUS_MITIGATED
-
-                        # Apply mitigation to exposed, but this wastes mitigation                        
-                        else:
-                            mitigations_used += 1
-                       
-                else:
-                    break
-
-            ########################################################
-            # Make it so have an option to use all the mitigations
-            if use_all:
-                # Basically repeat above with the given strategy
-                # but figure out suscept again since they could've changed
-                #
-                susceptible = get_all_of_status(m, target_status=STATUS_SUSCEPTIBLE)
-                susexp = susceptible + exposed
-                # Shuffle because we have limited resources and don't want any ordering
-                random.shuffle(susexp)     
-
-                # These numbers may have changed too
-                num_suscept = get_num_nodes(m, STATUS_SUSCEPTIBLE)
-                num_susexp = num_suscept + num_exposed
-                num_removed = get_num_nodes(m, target_status=STATUS_REMOVED)
-
-                # Evaluate nodes
-                # Only consider susceptible and exposed currently
-                # In future, we could consider infected and do neighbour/ring mitigation
-                for s in susexp:
-                    
-                    if mitigations_available(mitigations_per_measure + rollover_mitigations, mitigations_used):
-                        node_status = get_status(m, s)
-                        node_degree = get_degree(m, s)
-                        avg_neighbour_degree = get_avg_neighbour_degree(m, s)
-                        neighbour_susexp = get_num_neighbour_status(m, s, target_status=STATUS_SUSCEPTIBLE) + get_num_neighbour_status(m, s, target_status=STATUS_EXPOSED)
-                        neighbour_infected = get_num_neighbour_status(m, s, target_status=STATUS_INFECTED) 
-                        #neighbour_removed = get_num_neighbour_status(m, s, target_status=STATUS_REMOVED) 
-                        traveler = is_traveler(traveler_set, s)
-                        num_mitigation = mitigations_available(mitigations_per_measure + rollover_mitigations, mitigations_used)
-                        #mitigation = get_cur_mitigations(mitigations_per_measure + rollover_mitigations, mitigations_used)
-
-                        s_dist_inf = get_shortest_distance(short_dist, s, infected)
-
-                        do_we_mitigate = use_all_function(
-                                            #node_status,
-                                            node_degree,
-                                            avg_neighbour_degree,
-                                            neighbour_susexp, 
-                                            neighbour_infected,
-                                            #neighbour_removed,
-                                            traveler,
-                                            avg_degree,
-                                            #avg_dist,
-                                            #num_mitigation,
-                                            #mitigation,
-                                            num_susexp,
-                                            num_infected,
-                                            num_removed,
-                                            #s_dist_inf,
-                                            #i,
-                                            )
-
-                        if do_we_mitigate:
-                            if node_status == STATUS_SUSCEPTIBLE:
-                                cur_num_mitigated = mitigate_self(m, s)
-                                mitigations_used += cur_num_mitigated
-                                mitigations_used_effective += cur_num_mitigated
-                                mitigations_step['status'][s] = STATUS_MITIGATED
-
-                            # Apply mitigation to exposed, but this wastes mitigation                        
-                            else:
-                                mitigations_used += 1
-                           
-                    else:
-                        break
-            #############################################
+            # Graph may have changed if dynamic
+            adjacency = get_adjacency_matrix(m)
 
+            if use_dynamic and update_measures:
+                dynamic_measures.refresh(i)
+                static_features = get_static_features(m, dynamic_measures.travelers, dynamic_measures.minimal_vertex_cover, dynamic_measures.vertex_average_distance, dynamic_measures.number_shortest_paths, dynamic_measures.page_rank, dynamic_measures.cluster_coef)
+                avg_degree = dynamic_measures.average_degree
+                avg_dist = dynamic_measures.average_distance
+
+            # Identify those that are able to hav emitigation applied and apply the mitigation
+            mitigations_step, mitigations_used, mitigations_used_effective = mitigation_day(f, m, i, adjacency, static_features, avg_degree, avg_dist, mitigations_per_measure + rollover_mitigations, use_all=use_all, use_all_function=use_all_function, vectorized=vectorized)
 
             # If we are rolloig over
             # Rollover should be after the use_all 
@@ -295,18 +258,10 @@ def evaluate_individual(f, m, traveler_set, mvc_set=None, avg_degree=0, avg_dist
                 # rollovers can accumulate over multiple periods
                 rollover_mitigations = (mitigations_per_measure + rollover_mitigations) - mitigations_used
 
-
-
-
-
             total_mitigation += mitigations_used
             total_mitigation_effective += mitigations_used_effective
 
-            mitigations_step['node_count'][STATUS_MITIGATED] = total_mitigation_effective
-            mitigations_step['status_delta'][STATUS_MITIGATED] = mitigations_used_effective
-            mitigations_step['total_mitigations']['total'] = mitigations_used
-            mitigations_step['total_mitigations']['effective'] = mitigations_used_effective
-            mitigations_step['total_mitigations']['ineffective'] = mitigations_used - mitigations_used_effective
+            record_mitigation_totals(mitigations_step, mitigations_used, mitigations_used_effective, total_mitigation_effective)
 
             iterations_mitigations.append(mitigations_step)
 
@@ -314,20 +269,23 @@ def evaluate_individual(f, m, traveler_set, mvc_set=None, avg_degree=0, avg_dist
         #total_infected += current_infected
         #max_infected = max(max_infected, current_infected)
 
-        iterations.append(m.iteration())
+        # Once the epidemic is over stepping the model does nothing, so don't
+        if extinct:
+            iterations.append(extinct_iteration(i, get_status_array(m)))
+        else:
+            iterations.append(m.iteration())
+            extinct = early_stop and is_extinct(iterations[-1])
         
         
         # HERE WE DO DYNAMIC STUFF!!!!!!!!     
         if use_dynamic:
-            adds = select_group(m.graph.graph, ADD, probs)
-            removes = select_group(m.graph.graph, REMOVE, probs)
-        
             # Apply the changes
-            for v in adds:
-                add_edge(m.graph.graph,v)
-            
-            for v in removes:
-                remove_edge(m.graph.graph,v)
+            # dynamic_measures (if updating) is told about every changed edge
+            churn(m, ADD, REMOVE, probs, dynamic_measures, bridges)
+
+            # Native SEIR model keeps its own adjacency matrix
+            if hasattr(m, 'graph_changed'):
+                m.graph_changed()
         
         
 
@@ -340,6 +298,10 @@ def evaluate_individual(f, m, traveler_set, mvc_set=None, avg_degree=0, avg_dist
     # Would this make more sense in evaluate_population?
     m.reset()
 
+    if seed is not None:
+        random.setstate(random_state)
+        np.random.set_state(np_random_state)
+
     #print(max_infected, '\t', total_infected, '\t', final_num_removed - total_mitigation, '\t', total_mitigation)
     #print(final_num_removed, total_mitigation, final_num_removed - total_mitigation)
     #return final_num_removed - total_mitigation, 
@@ -349,6 +311,249 @@ def evaluate_individual(f, m, traveler_set, mvc_set=None, avg_degree=0, avg_dist
     #return final_num_susceptible, total_mitigation
     return iterations, iterations_mitigations,
 
+# Run replicates of evaluate_individual on the same graph all at once
+# The graph must be static (no dynamic option here)
+# Returns a list of iterations and a list of iterations_mitigations (one per replicate)
+def evaluate_batch(f, m, replicates, traveler_set, mvc_set=None, avg_degree=0, avg_dist=0, short_dist={}, vert_avg_dist=None, number_vertex_shortest=None, Page_Rank=None, Cluster_Coeff=None, total_iterations=0, measure_every=0, mitigations_per_measure=0, rollover=False, use_all=False, use_all_function=default_use_all, vectorized=False, early_stop=True):
+
+    batch = seir.BatchSEIRModel(m, replicates)
+    views = [batch.replicate(r) for r in range(replicates)]
+
+    total_mitigation = [0]*replicates
+    total_mitigation_effective = [0]*replicates
+    rollover_mitigations = [0]*replicates
+
+    # List to record network changes throughout simulation
+    all_iterations = [[] for _ in range(replicates)]
+
+    # List to record network changes about mitigation strategies 
+    all_iterations_mitigations = [[] for _ in range(replicates)]
+
+    # Static measures and the graph are the same for everyone
+    static_features = get_static_features(batch, traveler_set, mvc_set, vert_avg_dist, number_vertex_shortest, Page_Rank, Cluster_Coeff)
+    adjacency = batch.adjacency
+
+    # Every replicate has no exposed or infected left (only with early_stop)
+    extinct = False
+
+    for i in range(total_iterations):
+
+        # If it is a day we evaluate our network and apply mitigation
+        if i != 0 and i % measure_every == 0:
+            for r in range(replicates):
+                mitigations_step, mitigations_used, mitigations_used_effective = mitigation_day(f, views[r], i, adjacency, static_features, avg_degree, avg_dist, mitigations_per_measure + rollover_mitigations[r], use_all=use_all, use_all_function=use_all_function, vectorized=vectorized)
+
+                if rollover:
+                    rollover_mitigations[r] = (mitigations_per_measure + rollover_mitigations[r]) - mitigations_used
+
+                total_mitigation[r] += mitigations_used
+                total_mitigation_effective[r] += mitigations_used_effective
+
+                record_mitigation_totals(mitigations_step, mitigations_used, mitigations_used_effective, total_mitigation_effective[r])
+
+                all_iterations_mitigations[r].append(mitigations_step)
+
+        # Everyone moves forward a day together (until they are all over)
+        if extinct:
+            iteration = [extinct_iteration(i, view.status) for view in views]
+        else:
+            iteration = batch.iteration()
+            extinct = early_stop and all(is_extinct(it) for it in iteration)
+        for r, it in enumerate(iteration):
+            all_iterations[r].append(it)
+
+    return all_iterations, all_iterations_mitigations
+
+# Is the epidemic over after this iteration (no exposed or infected)
+# Mitigations only make susceptible/exposed removed, so it stays over
+def is_extinct(iteration):
+    return iteration['node_count'][STATUS_EXPOSED] + iteration['node_count'][STATUS_INFECTED] == 0
+
+# The iteration (same as the model's) for day i once the epidemic is over
+# Nothing changes status, counts are whatever mitigation left
+def extinct_iteration(i, status):
+    counts = get_status_counts(status)
+    return {
+        'iteration': i,
+        'status': {},
+        'node_count': {st: int(counts[st]) for st in (STATUS_SUSCEPTIBLE, STATUS_INFECTED, STATUS_EXPOSED, STATUS_REMOVED)},
+        'status_delta': {st: 0 for st in (STATUS_SUSCEPTIBLE, STATUS_INFECTED, STATUS_EXPOSED, STATUS_REMOVED)},
+    }
+
+# Everything that happens on a measurement day for one model
+# Figure out who can be mitigated, build their features and apply f (and the use all function)
+# available is the number of mitigations we have to give out today
+def mitigation_day(f, m, i, adjacency, static_features, avg_degree, avg_dist, available, use_all=False, use_all_function=default_use_all, vectorized=False):
+    # Identify those that are able to hav emitigation applied
+    # Remember, we pretend we do not know that exposed are exposed
+    status = get_status_array(m)
+    susceptible = np.flatnonzero(status == STATUS_SUSCEPTIBLE).tolist()
+    exposed = np.flatnonzero(status == STATUS_EXPOSED).tolist()
+    susexp = susceptible + exposed
+    # Shuffle because we have limited resources and don't want any ordering
+    random.shuffle(susexp)          
+
+    counts = get_status_counts(status)
+    num_suscept = counts[STATUS_SUSCEPTIBLE]
+    num_exposed = counts[STATUS_EXPOSED]
+    num_susexp = num_suscept + num_exposed
+    num_infected = counts[STATUS_INFECTED]
+    num_removed = counts[STATUS_REMOVED]
+
+    # Track mitigation details
+    mitigations_used = 0
+    mitigations_used_effective = 0
+    mitigations_step = {}
+    mitigations_step['iteration'] = i
+    mitigations_step['status'] = {}
+    mitigations_step['node_count'] = {}
+    mitigations_step['status_delta'] = {}
+    mitigations_step['total_mitigations'] = {}
+
+    # Evaluate nodes
+    # Only consider susceptible and exposed currently
+    # In future, we could consider infected and do neighbour/ring mitigation
+    features = build_feature_matrix(adjacency, status, susexp, static_features, avg_degree, avg_dist, num_susexp, num_infected, num_removed)
+    if vectorized:
+        used, effective = apply_mitigations_vectorized(f, m, susexp, features, FEATURE_COLUMNS, available, mitigations_step)
+    else:
+        used, effective = apply_mitigations(f, m, susexp, features, FEATURE_COLUMNS, adjacency, available, mitigations_step)
+    mitigations_used += used
+    mitigations_used_effective += effective
+
+    ########################################################
+    # Make it so have an option to use all the mitigations
+    if use_all:
+        # Basically repeat above with the given strategy
+        # but figure out suscept again since they could've changed
+        #
+        status = get_status_array(m)
+        susceptible = np.flatnonzero(status == STATUS_SUSCEPTIBLE).tolist()
+        susexp = susceptible + exposed
+        # Shuffle because we have limited resources and don't want any ordering
+        random.shuffle(susexp)     
+
+        # These numbers may have changed too
+        counts = get_status_counts(status)
+        num_suscept = counts[STATUS_SUSCEPTIBLE]
+        num_susexp = num_suscept + num_exposed
+        num_removed = counts[STATUS_REMOVED]
+
+        # Evaluate nodes
+        # Only consider susceptible and exposed currently
+        # In future, we could consider infected and do neighbour/ring mitigation
+        # The budget is whatever the main function left over
+        features = build_feature_matrix(adjacency, status, susexp, static_features, avg_degree, avg_dist, num_susexp, num_infected, num_removed)
+        used, effective = apply_mitigations(use_all_function, m, susexp, features, USE_ALL_COLUMNS, adjacency, available - mitigations_used, mitigations_step)
+        mitigations_used += used
+        mitigations_used_effective += effective
+    #############################################
+
+    return mitigations_step, mitigations_used, mitigations_used_effective
+
+# Fill in the counts on a mitigation step after the day is done
+def record_mitigation_totals(mitigations_step, mitigations_used, mitigations_used_effective, total_mitigation_effective):
+    mitigations_step['node_count'][STATUS_MITIGATED] = total_mitigation_effective
+    mitigations_step['status_delta'][STATUS_MITIGATED] = mitigations_used_effective
+    mitigations_step['total_mitigations']['total'] = mitigations_used
+    mitigations_step['total_mitigations']['effective'] = mitigations_used_effective
+    mitigations_step['total_mitigations']['ineffective'] = mitigations_used - mitigations_used_effective
+
+# Static per node measures as arrays indexed by node
+def get_static_features(m, traveler_set, mvc_set, vert_avg_dist, number_vertex_shortest, Page_Rank, Cluster_Coeff):
+    n = m.graph.graph.number_of_nodes()
+    static_features = {}
+    static_features[FEATURE_TRAVELER] = get_node_array(traveler_set, n)
+    static_features[FEATURE_MVC] = get_node_array(mvc_set, n)
+    static_features[FEATURE_AVG_DIST_SGL] = get_node_array(vert_avg_dist, n)
+    static_features[FEATURE_NUM_SHORT] = get_node_array(number_vertex_shortest, n)
+    static_features[FEATURE_PR] = get_node_array(Page_Rank, n)
+    static_features[FEATURE_CCOEF] = get_node_array(Cluster_Coeff, n)
+    return static_features
+
+# Feature matrix for the given nodes (one row per node, in the same order)
+# All the neighbour counts come from one sparse product
+def build_feature_matrix(adjacency, status, nodes, static_features, avg_degree, avg_dist, num_susexp, num_infected, num_removed):
+    nodes = np.asarray(nodes, dtype=np.int64)
+    degrees = get_degrees(adjacency)
+    neighbour_counts = get_neighbour_status_counts(adjacency, status)
+
+    features = np.empty((len(nodes), NUM_FEATURES))
+    features[:, FEATURE_DEGREE] = degrees[nodes]
+    features[:, FEATURE_NB_DEGREE] = get_avg_neighbour_degrees(adjacency, degrees)[nodes]
+    features[:, FEATURE_NB_SUSEXP] = neighbour_counts[nodes, STATUS_SUSCEPTIBLE] + neighbour_counts[nodes, STATUS_EXPOSED]
+    features[:, FEATURE_NB_INFECT] = neighbour_counts[nodes, STATUS_INFECTED]
+    features[:, FEATURE_AVG_DEGREE] = avg_degree
+    features[:, FEATURE_AVG_DIST_ALL] = avg_dist
+    features[:, FEATURE_NUM_SUSEXP] = num_susexp
+    features[:, FEATURE_NUM_INFECT] = num_infected
+    features[:, FEATURE_NUM_REMOVE] = num_removed
+    for column, values in static_features.items():
+        features[:, column] = values[nodes]
+
+    return features
+
+# Go through the nodes in order and ask f about each one (using its row of features)
+# until we run out of mitigations
+# When a susceptible node is mitigated its neighbours lose a susexp neighbour,
+# so we patch their rows to match what a per node calculation would see
+def apply_mitigations(f, m, nodes, features, columns, adjacency, available, mitigations_step):
+    mitigations_used = 0
+    mitigations_used_effective = 0
+
+    row_of = np.full(adjacency.shape[0], -1)
+    row_of[np.asarray(nodes, dtype=np.int64)] = np.arange(len(nodes))
+
+    for k, s in enumerate(nodes):
+        if not mitigations_available(available, mitigations_used):
+            break
+
+        row = features[k].tolist()
+        for b in FEATURE_BOOLS:
+            row[b] = row[b] > 0
+
+        do_we_mitigate = f(*[row[c] for c in columns])
+
+        if do_we_mitigate:
+            if get_status(m, s) == STATUS_SUSCEPTIBLE:
+                cur_num_mitigated = mitigate_self(m, s)
+                mitigations_used += cur_num_mitigated
+                mitigations_used_effective += cur_num_mitigated
+                mitigations_step['status'][s] = STATUS_MITIGATED
+
+                neighbour_rows = row_of[adjacency.indices[adjacency.indptr[s]:adjacency.indptr[s+1]]]
+                features[neighbour_rows[neighbour_rows >= 0], FEATURE_NB_SUSEXP] -= 1
+
+            # Apply mitigation to exposed, but this wastes mitigation                        
+            else:
+                mitigations_used += 1
+
+    return mitigations_used, mitigations_used_effective
+
+# Same as apply_mitigations, but f is a vectorized function
+# f gets every row at once and we mitigate the first true ones (in order)
+# until we run out of mitigations
+def apply_mitigations_vectorized(f, m, nodes, features, columns, available, mitigations_step):
+    mitigations_used = 0
+    mitigations_used_effective = 0
+
+    inputs = [features[:, c] > 0 if c in FEATURE_BOOLS else features[:, c] for c in columns]
+    do_we_mitigate = f(*inputs)
+    chosen = np.asarray(nodes, dtype=np.int64)[np.flatnonzero(do_we_mitigate)[:max(available, 0)]]
+
+    for s in chosen.tolist():
+        if get_status(m, s) == STATUS_SUSCEPTIBLE:
+            cur_num_mitigated = mitigate_self(m, s)
+            mitigations_used += cur_num_mitigated
+            mitigations_used_effective += cur_num_mitigated
+            mitigations_step['status'][s] = STATUS_MITIGATED
+
+        # Apply mitigation to exposed, but this wastes mitigation                        
+        else:
+            mitigations_used += 1
+
+    return mitigations_used, mitigations_used_effective
+
 def mitigation_trends(iterations_mitigations):
     trends = [{'trends': {}}]
 
@@ -399,35 +604,63 @@ def convert_iterations_mitigations(iterations_mitigations):
 
 
 
-def remove_edge(g, v):
-    neighbour = select_neighbour(g, v)
-    g.remove_edge(v, neighbour)
+# measures (DynamicMeasures) is told if an edge (not a self loop) is removed
+# If bridges (BridgeIndex) is given it is used to check if removing the edge would
+# disconnect the graph before removing it (instead of removing it and checking for a path)
+# neighbour is the edge's other vertex (selected at random if not given)
+def remove_edge(g, v, measures=None, bridges=None, neighbour=None):
+    if neighbour is None:
+        neighbour = select_neighbour(g, v)
+
+    if bridges is not None:
+        # Would disconnect the graph, skip it (same as the undo below)
+        if bridges.is_bridge(v, neighbour):
+            return False
+        g.remove_edge(v, neighbour)
+        bridges.edge_removed(v, neighbour)
+
+    else:
+        g.remove_edge(v, neighbour)
     
-    # If we accidentally disconnected the graph
-    # UNDO UNDO UNDO
-    # If this happens, we just skip and don't bother trying again because v may only have
-    # 1 neighbour and I am lazy
-    if not(nx.has_path(g,v,neighbour)):
-        g.add_edge(v, neighbour)
-        #try_again = remove_edge(g, neighbour)
-        return False #or try_again #, neighbour
+        # If we accidentally disconnected the graph
+        # UNDO UNDO UNDO
+        # If this happens, we just skip and don't bother trying again because v may only have
+        # 1 neighbour and I am lazy
+        if not(nx.has_path(g,v,neighbour)):
+            g.add_edge(v, neighbour)
+            #try_again = remove_edge(g, neighbour)
+            return False #or try_again #, neighbour
+
+    if measures is not None and neighbour != v:
+        measures.edge_changed(v, neighbour, False)
     return True #, neighbour
 
 # Two potential problems here:
 # 1. If the neighbour has no other neighbours other than v, then we get an exception. If this happens, ignore and plug our nose
 # 2. If v already has an edge to neighbour_neighbour, then just plug our nose and ignore
-def add_edge(g, v):
+# measures (DynamicMeasures) is told if a new edge (not a self loop) is added
+# bridges (BridgeIndex) is told about any edge added
+def add_edge(g, v, measures=None, bridges=None):
     neighbour = select_neighbour(g, v)
     try:
         neighbour_neighbour = select_neighbour_neighbour(g, neighbour, v)
         g.add_edge(v, neighbour_neighbour)
+        if bridges is not None:
+            bridges.edge_added(v, neighbour_neighbour)
+        if measures is not None:
+            measures.edge_changed(v, neighbour_neighbour, True)
         return True
     except ValueError:
         # If nothing works, just add a random fucking
         # edge. Sure, maybe the random vertex selected
         # is already connected, but whatever, better than nothing
         planB = np.random.randint(g.number_of_nodes())
+        new_edge = planB != v and not g.has_edge(v, planB)
         g.add_edge(v, planB)
+        if bridges is not None:
+            bridges.edge_added(v, planB)
+        if measures is not None and new_edge:
+            measures.edge_changed(v, planB, True)
         return False
     
 
@@ -435,23 +668,92 @@ def add_edge(g, v):
 
 # Select however many verticies for a 
 # group (add, remove, change). 
+# Add and remove edges for one day of a dynamic graph
+# Same as calling add_edge for n_add vertices and then remove_edge for n_remove vertices (selected with ps),
+# except the neighbours (and neighbour's neighbours) are all picked at once from the graph at the start of the day
+# This only matters if an edge used by one change was changed earlier that day
+#   * an add picks an edge that was just added (it is only added once)
+#   * a remove picks an edge that was already removed (skipped, like when it would disconnect the graph)
+def churn(m, n_add, n_remove, ps=None, measures=None, bridges=None):
+    g = m.graph.graph
+    n = g.number_of_nodes()
+    adds = select_group(g, n_add, ps)
+    removes = select_group(g, n_remove, ps)
+
+    adjacency = get_adjacency_matrix(m)
+    adjacency.sum_duplicates()
+    indptr, indices = adjacency.indptr, adjacency.indices
+
+    add_neighbours = select_neighbours(indptr, indices, adds)
+    add_neighbour_neighbours = select_neighbour_neighbours(indptr, indices, adds, add_neighbours)
+    remove_neighbours = select_neighbours(indptr, indices, removes)
+
+    for v, neighbour_neighbour in zip(adds.tolist(), add_neighbour_neighbours.tolist()):
+        # Plan B (see add_edge)
+        if neighbour_neighbour < 0:
+            neighbour_neighbour = np.random.randint(n)
+        new_edge = neighbour_neighbour != v and not g.has_edge(v, neighbour_neighbour)
+        g.add_edge(v, neighbour_neighbour)
+        if bridges is not None:
+            bridges.edge_added(v, neighbour_neighbour)
+        if measures is not None and new_edge:
+            measures.edge_changed(v, neighbour_neighbour, True)
+
+    for v, neighbour in zip(removes.tolist(), remove_neighbours.tolist()):
+        if neighbour >= 0 and g.has_edge(v, neighbour):
+            remove_edge(g, v, measures, bridges, neighbour)
+
+# n vertices selected (with replacement) with probabilities ps (None is uniform)
 def select_group(g, n, ps):
-    group = []
-    for i in range(n):
-        v = np.random.choice(range(g.number_of_nodes()), p=ps)
-        group.append(v)
-    return group
+    return np.random.choice(g.number_of_nodes(), size=n, p=ps)
+
+# A random neighbour of each vertex in vs from CSR arrays (-1 if it has none)
+def select_neighbours(indptr, indices, vs):
+    degrees = indptr[vs + 1] - indptr[vs]
+    neighbours = np.full(len(vs), -1, dtype=np.int64)
+    has_neighbours = degrees > 0
+    picks = (np.random.random(np.count_nonzero(has_neighbours)) * degrees[has_neighbours]).astype(np.int64)
+    neighbours[has_neighbours] = indices[indptr[vs[has_neighbours]] + picks]
+    return neighbours
+
+# A random neighbour of each us[i] that is not vs[i] or one of vs[i]'s neighbours, from CSR arrays (sorted indices)
+# Same as select_neighbour_neighbour for every pair at once (-1 if there is none, where it would raise a ValueError)
+def select_neighbour_neighbours(indptr, indices, vs, us):
+    n = len(indptr) - 1
+    picks = np.full(len(vs), -1, dtype=np.int64)
+    has_neighbour = us >= 0
+    lengths = np.zeros(len(vs), dtype=np.int64)
+    lengths[has_neighbour] = indptr[us[has_neighbour] + 1] - indptr[us[has_neighbour]]
+    if lengths.sum() == 0:
+        return picks
+
+    # Every candidate (neighbour of us[i]) in one array, group says which pair it belongs to
+    group = np.repeat(np.arange(len(vs)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    candidates = indices[indptr[np.maximum(us, 0)][group] + offsets].astype(np.int64)
+    owners = vs[group].astype(np.int64)
+
+    # Is (owner, candidate) already an edge (search the sorted edge keys)
+    edge_keys = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr)) * n + indices
+    candidate_keys = owners * n + candidates
+    positions = np.minimum(np.searchsorted(edge_keys, candidate_keys), len(edge_keys) - 1)
+    adjacent = edge_keys[positions] == candidate_keys
+
+    # Uniformly pick one of the valid candidates of each pair
+    valid = (candidates != owners) & ~adjacent
+    counts = np.bincount(group[valid], minlength=len(vs))
+    firsts = np.cumsum(counts) - counts
+    ranks = (np.random.random(len(vs)) * counts).astype(np.int64)
+    has_candidates = counts > 0
+    picks[has_candidates] = candidates[valid][firsts[has_candidates] + ranks[has_candidates]]
+    return picks
 
 # Generate the vertices probabilities    
 def generate_node_prob(g):
-    edge_counts = []
-    
     # Get each vertex's neighbour count 
-    for v in range(g.number_of_nodes()):
-        edge_counts.append(len(list(g.neighbors(v))))
+    edge_counts = np.fromiter((len(g[v]) for v in range(g.number_of_nodes())), dtype=np.int64, count=g.number_of_nodes())
         
     # Normalize neighbour count for probabilities
-    edge_counts = np.array(edge_counts)
     edge_counts_p = edge_counts/np.sum(edge_counts)
     
     return edge_counts_p
@@ -0,0 +1,92 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.2
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Behavioural fingerprints of trees so identical behaving trees share a simulation
+
+    0.2 (October 18, 2026):
+        - Many more epidemic states (1024), each one only gives a small random block of rows
+            * The global counts (number infected, etc.) only took `states` (8) distinct values,
+              so trees that only differed in a threshold on them got the same fingerprint
+            * Each status in turn gets a uniform share of the nodes, so every count covers its whole range
+
+End Change Log
+
+Behavioural fingerprints of GP trees.
+
+Lots of trees are different but do the exact same thing (eg. and_(True, MVC)
+and MVC). A tree is (vectorized) compiled and run on a fixed sample of feature
+rows and the resulting boolean mask is hashed. Trees with the same
+fingerprint said the same thing about every row, so they can share one
+epidemic simulation.
+
+The sample is a small random block of susceptible/exposed nodes under each of
+many random epidemic states (random mixes of S, E, I and R), so the dynamic
+measures (neighbour counts, number infected, etc.) take realistic values too.
+The global counts (number infected, etc.) are the same for every row of a
+state, so it takes lots of states for them to cover their range densely.
+The sample is made once (fixed seed) so fingerprints are the same every
+generation.
+
+NOTE: Two trees could agree on the whole sample and still differ somewhere
+      else. More states makes this less likely.
+
+'''
+
+###########
+# Imports #
+###########
+
+import hashlib
+import numpy as np
+
+from measures import *
+
+import evaluate
+
+
+# Feature columns (inputs to a vectorized tree) to fingerprint trees on
+# Takes the same keyword arguments as evaluate_individual (the ones it does not need are ignored)
+# block rows (susceptible/exposed nodes) from each of the random epidemic states
+def get_fingerprint_sample(m, traveler_set, mvc_set=None, avg_degree=0, avg_dist=0, vert_avg_dist=None, number_vertex_shortest=None, Page_Rank=None, Cluster_Coeff=None, states=1024, block=8, seed=0, **kwargs):
+    rng = np.random.RandomState(seed)
+    n = m.graph.graph.number_of_nodes()
+
+    adjacency = get_adjacency_matrix(m)
+    static_features = evaluate.get_static_features(m, traveler_set, mvc_set, vert_avg_dist, number_vertex_shortest, Page_Rank, Cluster_Coeff)
+
+    statuses = [evaluate.STATUS_SUSCEPTIBLE, evaluate.STATUS_EXPOSED, evaluate.STATUS_INFECTED, evaluate.STATUS_REMOVED]
+    feature_matrices = []
+    for k in range(states):
+        # One status (in turn) gets a uniform share of the nodes, the others split what is left
+        # so every global count covers its whole range, not just the low end
+        p = np.empty(len(statuses))
+        first = k % len(statuses)
+        p[first] = rng.uniform()
+        p[np.arange(len(statuses)) != first] = (1 - p[first]) * rng.dirichlet(np.ones(len(statuses) - 1))
+        status = rng.choice(statuses, size=n, p=p).astype(np.int8)
+        susexp = np.flatnonzero((status == evaluate.STATUS_SUSCEPTIBLE) | (status == evaluate.STATUS_EXPOSED))
+        if len(susexp) > block:
+            susexp = np.sort(rng.choice(susexp, size=block, replace=False))
+
+        counts = get_status_counts(status)
+        num_susexp = counts[evaluate.STATUS_SUSCEPTIBLE] + counts[evaluate.STATUS_EXPOSED]
+        num_infected = counts[evaluate.STATUS_INFECTED]
+        num_removed = counts[evaluate.STATUS_REMOVED]
+
+        feature_matrices.append(evaluate.build_feature_matrix(adjacency, status, susexp, static_features, avg_degree, avg_dist, num_susexp, num_infected, num_removed))
+
+    features = np.concatenate(feature_matrices)
+    return [features[:, c] > 0 if c in evaluate.FEATURE_BOOLS else features[:, c] for c in evaluate.FEATURE_COLUMNS]
+
+# Fingerprint of a vectorized compiled tree on the sample
+def fingerprint(f, sample):
+    with np.errstate(all='ignore'):
+        mask = np.asarray(f(*sample), dtype=bool)
+    return hashlib.sha1(np.packbits(mask).tobytes()).hexdigest()
@@ -0,0 +1,117 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.1
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Island model, elites migrate around a ring of GP runs through the file system
+
+End Change Log
+
+Island model GP.
+
+Each island is its own GP run (a SLURM array task or a local process) with
+its own population. Every `every` generations an island
+
+    - writes (copies of) its best `migrants` individuals to <directory>/island_<i>.pkl
+    - takes the newest migrants of the island before it in the ring (i - 1) if
+      there are any it has not seen yet, they replace its worst individuals
+
+Migration never waits for the other islands, an island that is behind just
+gets older migrants (or none yet). Files are written to a temp file and then
+moved into place, so a half written file is never read. Only the newest
+migrants of each island are kept on disk.
+
+Drivers only do this when asked to (ISLAND_MODEL), otherwise array tasks
+are independent runs.
+
+Which island this is comes from SLURM (array task ID) or the ISLAND and
+ISLANDS environment variables for local processes, eg.
+
+    ISLAND=0 ISLANDS=4 python eCov-GP-eval.py &
+    ISLAND=1 ISLANDS=4 python eCov-GP-eval.py &
+    ...
+
+NOTE: Immigrants keep the fitness they got on their own island (which may be
+      on a different graph) until they are evaluated again.
+
+'''
+
+###########
+# Imports #
+###########
+
+import os
+import pickle
+
+
+# This island's number (0 -- n_islands-1) and the number of islands
+# SLURM array tasks are islands, otherwise ISLAND and ISLANDS, otherwise just one island
+def get_island():
+    if 'SLURM_ARRAY_TASK_ID' in os.environ:
+        first = int(os.environ.get('SLURM_ARRAY_TASK_MIN', 0))
+        return int(os.environ['SLURM_ARRAY_TASK_ID']) - first, int(os.environ.get('SLURM_ARRAY_TASK_COUNT', 1))
+    return int(os.environ.get('ISLAND', 0)), int(os.environ.get('ISLANDS', 1))
+
+# Directory all the islands of a run share
+# Every SLURM array job gets its own
+def get_run_directory(directory):
+    return os.path.join(directory, os.environ.get('SLURM_ARRAY_JOB_ID', 'local'))
+
+
+class Islands(object):
+
+    # Send `migrants` individuals to the next island every `every` generations
+    def __init__(self, directory, island, n_islands, migrants=5, every=10):
+        self.directory = directory
+        self.island = island
+        self.n_islands = n_islands
+        self.migrants = migrants
+        self.every = every
+
+        # Generation of the last migrants taken from the island before this one
+        self.received = -1
+
+        if n_islands > 1:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, island):
+        return os.path.join(self.directory, 'island_' + str(island) + '.pkl')
+
+    # If there is migration after generation g
+    def due(self, g):
+        return self.n_islands > 1 and self.every > 0 and g > 0 and g % self.every == 0
+
+    # Best individuals of the (evaluated) population to the next island
+    def emigrate(self, population, g, toolbox):
+        best = sorted(population, key=lambda ind: ind.fitness, reverse=True)[:self.migrants]
+        path = self.get_path(self.island)
+        tmp = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((g, list(map(toolbox.clone, best))), f)
+        os.replace(tmp, path)
+
+    # Newest migrants from the island before this one (empty if nothing new)
+    def immigrants(self):
+        path = self.get_path((self.island - 1) % self.n_islands)
+        if not os.path.exists(path):
+            return []
+        g, migrants = pickle.load(open(path, 'rb'))
+        if g <= self.received:
+            return []
+        self.received = g
+        return migrants
+
+    # Send this island's best and put the newest migrants in place of the worst
+    # Returns the number of immigrants
+    def migrate(self, population, g, toolbox):
+        self.emigrate(population, g, toolbox)
+        migrants = self.immigrants()
+        worst = sorted(range(len(population)), key=lambda i: population[i].fitness)[:len(migrants)]
+        for i, ind in zip(worst, migrants):
+            population[i] = ind
+        return len(migrants)
@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       June 8, 2020
 
-Version:    0.2
+Version:    0.4
 
 
 Change Log:
@@ -12,6 +12,14 @@ Change Log:
     0.2 (June 17, 2020):
         - Updated to incorporate new measure of average degree
 
+    0.3 (October 18, 2026):
+        - Added a vectorized compiler for the language
+            * Compiled trees take whole feature columns (arrays) and return a boolean mask
+            * Each primitive is swapped for its numpy version (np.where for if_then_else, etc.)
+
+    0.4 (October 18, 2026):
+        - Ephemeral constants made by named functions instead of lambdas so trees can be pickled (checkpoints)
+
 
 End Change Log
 
@@ -84,6 +92,15 @@ def if_then_else(in1, out1, out2):
     return out1 if in1 else out2
 
 
+# Ephemeral constants
+# Not lambdas, otherwise trees with them can not be pickled
+def rand_float():
+    return random.random()*1000
+
+def rand_int():
+    return random.randint(0,33)
+
+
 def protectedDiv(a, b):
     try:
         q = a / b
@@ -170,10 +187,48 @@ language.addPrimitive(if_then_else, [bool, bool, bool], bool)
 language.addPrimitive(if_then_else, [bool, float, float], float)
 
 # Constants
-language.addEphemeralConstant("rand_float_0-100", lambda: random.random()*1000, float)
+language.addEphemeralConstant("rand_float_0-100", rand_float, float)
 #language.addEphemeralConstant("rand100", lambda: random.random() * 100, float)
 #language.addEphemeralConstant("rand_bool", lambda: True if random.random() < 0.5 else False, bool)
-language.addEphemeralConstant("rand_int_0-33", lambda: random.randint(0,33), float)
+language.addEphemeralConstant("rand_int_0-33", rand_int, float)
 language.addTerminal(False, bool)
 language.addTerminal(True, bool)
 
+
+
+##########################
+# Vectorized Compilation #
+##########################
+
+def vectorized_protectedDiv(a, b):
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    q = np.ones(a.shape)
+    np.divide(a, b, out=q, where=b != 0)
+    return q
+
+# numpy versions of the primitives above (by primitive name)
+# Everything works elementwise on whole feature columns
+vectorized_context = {'add': np.add,
+                        'sub': np.subtract,
+                        'mul': np.multiply,
+                        'protectedDiv': vectorized_protectedDiv,
+                        'and_': np.logical_and,
+                        'or_': np.logical_or,
+                        'not_': np.logical_not,
+                        'eq': np.equal,
+                        'lt': np.less,
+                        'gt': np.greater,
+                        'if_then_else': np.where,
+                        }
+
+# Like gp.compile, but the resulting function is called with one array per
+# argument (a column of the feature matrix) and returns a boolean mask with
+# one entry per row
+def compile_vectorized(expr, pset):
+    code = "lambda {}: {}".format(", ".join(pset.arguments), str(expr))
+    f = eval(code, dict(vectorized_context), {})
+
+    def mask(*columns):
+        return np.broadcast_to(np.asarray(f(*columns), dtype=bool), np.shape(columns[0]))
+
+    return mask
@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       June 8, 2020
 
-Version:    0.9
+Version:    0.22
 
 
 Change Log:
@@ -47,6 +47,68 @@ Change Log:
         - Fixed # shortest paths
         - Added single measures corresponding to whole graph measures
 
+    0.11 (October 18, 2026):
+        - Added vectorized measures (CSR adjacency, status array, neighbour status counts)
+            * All nodes at once instead of one node at a time
+        - Added get_node_array to turn the static measures (sets, dicts, lists) into per node arrays
+
+    0.12 (October 18, 2026):
+        - Status functions also work when the model's status is an array (native SEIR model)
+
+    0.13 (October 18, 2026):
+        - All pairs shortest distances with one BFS per node (scipy csgraph) into an int16 matrix
+            * get_distance_matrix; unreachable pairs are -1
+            * Average distance, vertex average distance and shortest distances all come from it
+            * Pass the matrix (dists) in so it is only calculated once
+
+    0.14 (October 18, 2026):
+        - Number of shortest paths a node is in without storing every path
+            * One BFS per node and subtree sizes, same counts as before
+            * all_paths option (Brandes style) to count every shortest path
+
+    0.15 (October 18, 2026):
+        - GraphMeasures: all the static measures of a graph in one object
+            * Identified by a hash of the edge list (get_graph_hash)
+            * Saved to/loaded from a .npz cache so the same graph is only measured once
+            * as_kwargs() gives the keyword arguments for evaluate_individual
+
+    0.16 (October 18, 2026):
+        - Travelers are now the nodes on the boundary of their community (one pass over the edges)
+            * Need more than min_fraction (default half) of their edges leaving their community
+            * Option to find the communities with louvain (get_communities)
+            * The old minimum edge cut version is still there (mincut=True)
+
+    0.17 (October 18, 2026):
+        - DynamicMeasures: static measures kept up to date on dynamic graphs
+            * Clustering coefficient and average degree updated around each changed edge
+            * Pagerank, distances, # shortest paths and vertex cover recalculated when older than a number of days
+
+    0.18 (October 18, 2026):
+        - BridgeIndex: can an edge be removed without disconnecting the graph, without touching it
+            * Quick checks first (self loops, leaves, triangles), then a bridge set that is only rebuilt when needed
+
+    0.19 (October 18, 2026):
+        - BridgeIndex: any added edge makes the bridge set stale (an edge joining two components is a new bridge)
+
+    0.20 (October 18, 2026):
+        - GraphMeasures cache key includes MEASURES_VERSION and the traveler options, not just the graph
+            * Bump MEASURES_VERSION when a measure changes so old cache files are not used
+
+    0.21 (October 18, 2026):
+        - TRAVELERS ARE NOT THE SAME NODES AS BEFORE 0.16
+            * 0.16 made travelers the community boundary nodes (more than min_fraction = 0.5 of their edges leaving),
+              before that they were the nodes in the minimum edge cuts between communities (now mincut=True)
+            * The two sets are quite different (eg. 59 boundary travelers vs 72 mincut ones, only 20 in both),
+              so TRAVELER results from before and after 0.16 are not comparable
+        - get_traveler_definition/TRAVELER_DEFINITION, a string saying which travelers were used
+            * Part of the GraphMeasures cache key (defaults included) and saved with it
+            * The test drivers save it with their results, the results catalog reads it back
+
+    0.22 (October 18, 2026):
+        - Self loops in get_adjacency_matrix are one entry (they were mirrored onto themselves, a diagonal of 2)
+            * Neighbour status counts no longer count a node with a self loop as its own neighbour twice
+            * get_degrees counts a self loop twice, same as networkx (it counted it once)
+
 End Change Log
 
 All graph measures are contained within this file. 
@@ -62,13 +124,17 @@ Not all measures will necessairly be used
 # Imports #
 ###########
 
+import hashlib
 import ndlib.models.ModelConfig as mc
 import ndlib.models.epidemics as ep
 import networkx as nx
 import networkx.algorithms.community as comm
 import networkx.algorithms.approximation as appr
 import numpy as np
+import os
 import random
+import scipy.sparse
+import scipy.sparse.csgraph
 
 from ndlib.viz.mpl.DiffusionTrend import DiffusionTrend
 from ndlib.viz.mpl.DiffusionPrevalence import DiffusionPrevalence
@@ -82,10 +148,53 @@ from ndlib.viz.mpl.DiffusionPrevalence import DiffusionPrevalence
 ###################
 
 # Find nodes that connect communities
-def get_travelers(model):
+# A traveler is a node with more than min_fraction of its edges going to
+# other communities (min_fraction=0 means any edge to another community)
+# Found with one pass over the edge list
+# mincut=True gives the old (way slower) version, see get_travelers_mincut
+# louvain=True finds the communities with louvain (see get_communities)
+def get_travelers(model, min_fraction=0.5, mincut=False, louvain=False):
+    communities = get_communities(model, louvain)
+
+    if mincut:
+        return get_travelers_mincut(model, communities)
+
+    # Community of every node
+    n = model.graph.graph.number_of_nodes()
+    community = np.zeros(n, dtype=np.int64)
+    for c, nodes in enumerate(communities):
+        community[list(nodes)] = c
+
+    # Count the edges leaving each node's community
+    edges = np.array(list(model.graph.graph.edges()), dtype=np.int64).reshape(-1, 2)
+    between = community[edges[:, 0]] != community[edges[:, 1]]
+    degree = np.bincount(edges.ravel(), minlength=n)
+    leaving = np.bincount(edges[between].ravel(), minlength=n)
+
+    return set(np.flatnonzero((leaving > 0) & (leaving > min_fraction*degree)).tolist())
+
+# Which travelers get_travelers gives with these options (a string)
+# Saved with the graph measures and the results so different definitions are never mixed up
+def get_traveler_definition(min_fraction=0.5, mincut=False, louvain=False):
+    communities = 'louvain' if louvain else 'greedy'
+    if mincut:
+        return 'mincut(' + communities + ')'
+    return 'boundary(' + communities + ', min_fraction=' + str(min_fraction) + ')'
+
+# Communities of the graph (greedy modularity)
+# louvain=True uses louvain instead, which is a lot faster on bigger graphs
+# (only in networkx 2.8+, greedy modularity is used if it is not there)
+def get_communities(model, louvain=False):
+    if louvain and hasattr(comm, 'louvain_communities'):
+        return comm.louvain_communities(model.graph.graph)
+    return comm.greedy_modularity_communities(model.graph.graph)
+
+# Nodes in the minimal edge cut between (some node in) every pair of communities
+# One max flow per pair of communities
+def get_travelers_mincut(model, communities):
 
     # Pick some node in a community
-    com_nodes = [list(x)[0] for x in comm.greedy_modularity_communities(model.graph.graph)]
+    com_nodes = [list(x)[0] for x in communities]
     all_travelers = set()
 
     # Find minimal cut edges to seperate communities
@@ -116,54 +225,60 @@ def get_average_degree(model):
 
     return np.average(d)
 
-# Find shortest distance from all nodes to every other node
-def get_shortest_distances_all_nodes(model):
-    return dict(nx.shortest_path_length(model.graph.graph))
+# Distance (number of edges) from every node to every other node
+# One BFS per node (scipy csgraph), done a block of sources at a time
+# so we never hold more than a block of float distances
+# Unreachable pairs are -1
+def get_distance_matrix(model, block=256):
+    adjacency = get_adjacency_matrix(model)
+    n = adjacency.shape[0]
+    dists = np.empty((n, n), dtype=np.int16)
 
-# Find average distance from all nodes to every other node
-def get_avg_distances_all_nodes(model):
-     # add all the distances to this list
-    # in the end we will average these values    
-    distances = []
+    for start in range(0, n, block):
+        sources = np.arange(start, min(start + block, n))
+        d = scipy.sparse.csgraph.shortest_path(adjacency, directed=False, unweighted=True, indices=sources)
+        d[np.isinf(d)] = -1
+        dists[sources] = d
 
-    nodes = list(model.graph.graph.nodes)
+    return dists
 
-    # Only calc the top right triangle of distances since symetric 
-    for i in range(len(nodes)):
-        for j in range(i+1, len(nodes)):
-            try:
-                distances.append(nx.shortest_path_length(model.graph.graph, nodes[i], nodes[j]))
-            except nx.NetworkXNoPath:
-                distances.append(9999999)
+# Find shortest distance from all nodes to every other node
+# dists[i][j] is the distance from i to j (-1 if there is no path)
+def get_shortest_distances_all_nodes(model, dists=None):
+    if dists is None:
+        dists = get_distance_matrix(model)
+    return dists
+
+# Find average distance from all nodes to every other node
+# Pairs with no path count as 9999999
+def get_avg_distances_all_nodes(model, dists=None):
+    if dists is None:
+        dists = get_distance_matrix(model)
+    n = len(dists)
 
     # If there are no distances to take an average of
-    if len(distances) < 1:
-        avg = 0
-    else:
-        avg = np.average(distances)
+    if n < 2:
+        return 0
+
+    # Every pair shows up twice (symmetric) and the diagonal is 0
+    reachable = dists >= 0
+    total = np.sum(dists, where=reachable, dtype=np.float64)/2
+    no_path = (n*n - np.count_nonzero(reachable))/2
 
     # return the average
-    return avg
+    return (total + no_path*9999999)/(n*(n-1)/2)
 
 
 # Return a list of each node's average shortest
 # path length to all other nodes in the graph
-def get_node_avg_distances_all_nodes(model):
-    average_path_lengths = []
-    paths = dict(nx.shortest_path_length(model.graph.graph))
-    nodes = list(model.graph.graph.nodes)
-
-    for i in range(len(nodes)):
-                
-        node_lengths = []
-        for j in range(0, len(nodes)):
-            try:
-                node_lengths.append(paths[nodes[i]][nodes[j]])
-            except nx.NetworkXNoPath:
-                distances.append(9999999)
-        average_path_lengths.append(np.average(node_lengths))
+# (including itself, only nodes it can reach)
+def get_node_avg_distances_all_nodes(model, dists=None):
+    if dists is None:
+        dists = get_distance_matrix(model)
 
-    return average_path_lengths
+    reachable = dists >= 0
+    totals = np.sum(dists, axis=1, where=reachable, dtype=np.float64)
+    return (totals/np.count_nonzero(reachable, axis=1)).tolist()
 
 
 
@@ -176,25 +291,91 @@ def get_shortest_paths_all_nodes(model):
 # shortest path between any two nodes
 # This does count itself in paths to/from itself
 # For example, 0 is in the shortest path from 0 to X
-# WARNING, I THINK THIS ONLY CONSIDERS ONE PATH IF MORE THAN 
-#  ONE SHORTEST PATH EXISTS!!!!!!!
-##### WARNING, ACTUALLY, I THINK IT'S GOOD! BUT STILL NOT SURE REALLY
-def get_node_number_shortest_paths(model):
-    paths = dict(nx.shortest_path(model.graph.graph))
-    nodes = list(model.graph.graph.nodes)
+# Only one path is considered if more than one shortest path exists
+# (the same one nx.shortest_path gives)
+#
+# One BFS per node (no paths are stored). The BFS tree from i has the same
+# paths as nx.shortest_path(g, i), and a node is in the path from i to every
+# node in its subtree, so its count goes up by the size of its subtree.
+#
+# all_paths=True considers every shortest path instead (Brandes): each pair
+# adds the fraction of its shortest paths the node is in. The counts add up
+# to the same total as the one path version.
+def get_node_number_shortest_paths(model, all_paths=False, block=64):
+    if all_paths:
+        return get_node_number_all_shortest_paths(model, block)
+
+    adjacency = get_adjacency_matrix_nx_order(model)
+    n = adjacency.shape[0]
+    counts = np.zeros(n)
+
+    for i in range(n):
+        # directed is fine since the matrix is symmetric, and keeps the neighbour order
+        order, predecessors = scipy.sparse.csgraph.breadth_first_order(adjacency, i, directed=True, return_predecessors=True)
+        depth = get_tree_depths(predecessors)[order]
+
+        # Add the subtree sizes up from the deepest level to the root
+        sizes = np.zeros(n)
+        sizes[order] = 1
+        for level in range(depth[-1], 0, -1):
+            nodes = order[depth == level]
+            sizes += np.bincount(predecessors[nodes], weights=sizes[nodes], minlength=n)
+
+        counts += sizes
 
-    counts = np.zeros(len(nodes))
+    return counts
 
-    # For each node pair (each)
-    for i in range(len(nodes)):
-        for j in range(len(nodes)):
-            
-            # Iterate over the shortest path
-            # and add the indicies to the counts array
-            for k in range(len(paths[i][j])):
-                counts[paths[i][j][k]] += 1
+# Brandes style version counting all shortest paths (see above)
+# A block of sources at a time, level by level, with sparse products
+def get_node_number_all_shortest_paths(model, block=64):
+    adjacency = get_adjacency_matrix(model)
+    n = adjacency.shape[0]
+    counts = np.zeros(n)
+
+    for start in range(0, n, block):
+        sources = np.arange(start, min(start + block, n))
+        rows = np.arange(len(sources))
+
+        # Number of shortest paths (sigma) and distance from each source
+        sigma = np.zeros((len(sources), n))
+        sigma[rows, sources] = 1
+        depth = np.full((len(sources), n), -1)
+        depth[rows, sources] = 0
+
+        frontier = sigma.copy()
+        level = 0
+        while frontier.any():
+            reached = adjacency.dot(frontier.T).T
+            reached[depth >= 0] = 0
+            new = reached > 0
+            level += 1
+            depth[new] = level
+            sigma[new] = reached[new]
+            frontier = np.where(new, reached, 0)
+
+        # Dependencies, from the deepest level back to the sources
+        delta = np.zeros((len(sources), n))
+        for level in range(depth.max(), 0, -1):
+            coefficients = np.where(depth == level, (1 + delta)/np.where(sigma > 0, sigma, 1), 0)
+            contributions = adjacency.dot(coefficients.T).T
+            parents = depth == level - 1
+            delta[parents] += sigma[parents]*contributions[parents]
+
+        # +1 for the pair (source, node), where the node is the end point
+        counts += np.sum(np.where(depth >= 0, delta + 1, 0), axis=0)
 
     return counts
+
+# Depth of every node in a tree given by its predecessors (-9999 for the root and unreached nodes)
+def get_tree_depths(predecessors):
+    depths = np.zeros(len(predecessors), dtype=np.int64)
+    ancestors = predecessors.copy()
+    valid = ancestors >= 0
+    while valid.any():
+        depths[valid] += 1
+        ancestors[valid] = predecessors[ancestors[valid]]
+        valid = ancestors >= 0
+    return depths
     
 # Gets the pagerank
 # Not sure how helpful this will really be
@@ -214,6 +395,8 @@ def clustering_coefficient(model):
 # NOTE: We may want to return those that are susceptible AND exposed
 #       Since in reality we don't know who is who
 def get_all_of_status(model, target_status=0):
+    if isinstance(model.status, np.ndarray):
+        return np.flatnonzero(model.status == target_status).tolist()
     targets = []
     for node, status in model.status.items():
         if status == target_status:
@@ -222,6 +405,8 @@ def get_all_of_status(model, target_status=0):
 
 # Number of nodes of current status
 def get_num_nodes(model, target_status=0):
+    if isinstance(model.status, np.ndarray):
+        return int(np.count_nonzero(model.status == target_status))
     return list(model.status.values()).count(target_status) 
 
 
@@ -293,7 +478,7 @@ def get_shortest_distance(dists, node, targets):
     shortest = 9999999    # should do better here
     for t in targets:
         try:
-            if dists[node][t] < shortest:
+            if 0 <= dists[node][t] < shortest:
                 shortest = dists[node][t]
         except KeyError:
                 pass        # just do nothing
@@ -319,3 +504,360 @@ def get_cluster_coefficient(clusterC, node):
     return clusterC[node]
 
 
+#######################
+# VECTORIZED MEASURES #
+#######################
+
+# These assume the nodes are labeled 0 -- n-1 (like get_average_degree does)
+# so that row/index i of every array is node i
+
+# Sparse (CSR) adjacency matrix of the graph
+# Built from the edge list directly so it does not depend on the networkx version
+# A self loop is one entry (the node is its own neighbour once, like g.neighbors), not mirrored
+def get_adjacency_matrix(model):
+    g = model.graph.graph
+    n = g.number_of_nodes()
+    edges = np.array(list(g.edges()), dtype=np.int64).reshape(-1, 2)
+    mirrored = edges[edges[:, 0] != edges[:, 1]]
+    rows = np.concatenate((edges[:, 0], mirrored[:, 1]))
+    cols = np.concatenate((edges[:, 1], mirrored[:, 0]))
+    return scipy.sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+# Same as above, but each row has the neighbours in networkx's order (not sorted)
+# so a BFS over it visits nodes in the same order networkx does
+def get_adjacency_matrix_nx_order(model):
+    g = model.graph.graph
+    n = g.number_of_nodes()
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(g.adj[v]) for v in range(n)])
+    indices = np.fromiter((w for v in range(n) for w in g.adj[v]), dtype=np.int32, count=indptr[-1])
+    return scipy.sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n, n))
+
+# Current status of every node as an array
+def get_status_array(model):
+    if isinstance(model.status, np.ndarray):
+        return model.status
+    status = np.zeros(len(model.status), dtype=np.int8)
+    status[np.fromiter(model.status.keys(), dtype=np.int64)] = np.fromiter(model.status.values(), dtype=np.int8)
+    return status
+
+# Number of nodes of each status (index is the status)
+def get_status_counts(status):
+    return np.bincount(status, minlength=4)
+
+# Degree of every node, same as g.degree() (a self loop counts twice)
+def get_degrees(adjacency):
+    return np.asarray(adjacency.sum(axis=1)).ravel().astype(np.int64) + adjacency.diagonal().astype(np.int64)
+
+# Average degree of the neighbours of every node
+# Isolated nodes get 0 (same as nx.average_neighbor_degree)
+def get_avg_neighbour_degrees(adjacency, degrees):
+    totals = adjacency.dot(degrees.astype(float))
+    avgs = np.zeros(len(degrees))
+    np.divide(totals, degrees, out=avgs, where=degrees > 0)
+    return avgs
+
+# Number of neighbours of each status for every node
+# Column s is the count of neighbours with status s
+# One sparse product with the one-hot status matrix
+def get_neighbour_status_counts(adjacency, status):
+    one_hot = np.zeros((len(status), 4))
+    one_hot[np.arange(len(status)), status] = 1
+    return adjacency.dot(one_hot)
+
+# Turn a static measure into a per node array
+# Sets (travelers, vertex cover) become membership flags
+# dicts (pagerank, clustering) and lists are looked up by node
+def get_node_array(values, n):
+    arr = np.zeros(n)
+    if values is None:
+        return arr
+    if isinstance(values, (set, frozenset)):
+        members = [v for v in values if 0 <= v < n]
+        arr[members] = 1
+    elif isinstance(values, dict):
+        arr[np.fromiter(values.keys(), dtype=np.int64)] = np.fromiter(values.values(), dtype=float)
+    else:
+        arr[:] = np.asarray(values, dtype=float)[:n]
+    return arr
+
+
+##################
+# GRAPH MEASURES #
+##################
+
+# Version of the measure code, part of the GraphMeasures cache key
+# BUMP THIS when any of the measures (or their defaults) change, otherwise old cache files get loaded
+MEASURES_VERSION = 1
+
+# Hash of the graph (number of nodes and the edge list)
+# The same graph gives the same hash no matter what order the edges were added in
+def get_graph_hash(model):
+    g = model.graph.graph
+    edges = np.sort(np.array(list(g.edges()), dtype=np.int64).reshape(-1, 2), axis=1)
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+    h = hashlib.sha1(str(g.number_of_nodes()).encode())
+    h.update(edges.tobytes())
+    return h.hexdigest()
+
+# Cache key, the graph's hash, MEASURES_VERSION and the options the measures were calculated with
+def get_cache_key(graph_hash, **options):
+    h = hashlib.sha1(graph_hash.encode())
+    h.update(str(MEASURES_VERSION).encode())
+    h.update(repr(sorted(options.items())).encode())
+    return h.hexdigest()
+
+# Traveler definition of the defaults (what the drivers use)
+TRAVELER_DEFINITION = get_traveler_definition()
+
+# All the static measures of a graph, calculated once
+# If cache_directory is given they are loaded from <cache_directory>/<key>.npz
+# when it exists, and saved there when it does not (see get_cache_key)
+# The key has the traveler definition (get_traveler_definition), defaults included
+# Only worth it when the same graph is measured again (a new random graph every time just fills the disk)
+# traveler_options go to get_travelers
+class GraphMeasures(object):
+
+    def __init__(self, model, cache_directory=None, **traveler_options):
+        self.hash = get_graph_hash(model)
+        self.traveler_options = traveler_options
+        self.traveler_definition = get_traveler_definition(**traveler_options)
+
+        path = None
+        if cache_directory is not None:
+            path = os.path.join(cache_directory, get_cache_key(self.hash, travelers=self.traveler_definition) + '.npz')
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+        else:
+            self.calculate(model)
+            if path is not None:
+                self.save(path)
+
+    def calculate(self, model):
+        self.travelers = get_travelers(model, **self.traveler_options)
+        self.average_degree = get_average_degree(model)
+        self.distances = get_distance_matrix(model)
+        self.shortest_distances = get_shortest_distances_all_nodes(model, self.distances)
+        self.average_distance = get_avg_distances_all_nodes(model, self.distances)
+
+        self.vertex_average_distance = get_node_avg_distances_all_nodes(model, self.distances)
+        self.minimal_vertex_cover = get_min_vertex_cover(model)
+        self.number_shortest_paths = get_node_number_shortest_paths(model)
+        self.page_rank = get_all_page_rank(model)
+        self.cluster_coef = clustering_coefficient(model)
+
+    # Sets become arrays of nodes and dicts become arrays indexed by node
+    # Written to a temp file first so a half written file is never loaded
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        n = len(self.distances)
+        tmp = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f,
+                                hash=self.hash,
+                                traveler_definition=self.traveler_definition,
+                                travelers=np.array(sorted(self.travelers), dtype=np.int64),
+                                average_degree=self.average_degree,
+                                distances=self.distances,
+                                average_distance=self.average_distance,
+                                vertex_average_distance=np.array(self.vertex_average_distance),
+                                minimal_vertex_cover=np.array(sorted(self.minimal_vertex_cover), dtype=np.int64),
+                                number_shortest_paths=self.number_shortest_paths,
+                                page_rank=get_node_array(self.page_rank, n),
+                                cluster_coef=get_node_array(self.cluster_coef, n))
+        os.replace(tmp, path)
+
+    # Back to the same types the measure functions return
+    def load(self, path):
+        data = np.load(path)
+        self.travelers = set(data['travelers'].tolist())
+        self.average_degree = float(data['average_degree'])
+        self.distances = data['distances']
+        self.shortest_distances = self.distances
+        self.average_distance = float(data['average_distance'])
+
+        self.vertex_average_distance = data['vertex_average_distance'].tolist()
+        self.minimal_vertex_cover = set(data['minimal_vertex_cover'].tolist())
+        self.number_shortest_paths = data['number_shortest_paths']
+        self.page_rank = dict(enumerate(data['page_rank'].tolist()))
+        self.cluster_coef = dict(enumerate(data['cluster_coef'].tolist()))
+
+    # Keyword arguments for evaluate_individual (and evaluate_batch, setup_gp)
+    def as_kwargs(self):
+        return dict(traveler_set=self.travelers,
+                    mvc_set=self.minimal_vertex_cover,
+                    vert_avg_dist=self.vertex_average_distance,
+                    number_vertex_shortest=self.number_shortest_paths,
+                    Page_Rank=self.page_rank,
+                    Cluster_Coeff=self.cluster_coef,
+                    avg_degree=self.average_degree,
+                    short_dist=self.shortest_distances,
+                    avg_dist=self.average_distance)
+
+
+# Static measures kept up to date while edges are added/removed (dynamic graphs)
+#
+# Local measures (clustering coefficient, average degree) are updated around
+# each changed edge right away (triangles through the common neighbours).
+# Global measures (pagerank, distances, # shortest paths, vertex cover) are
+# recalculated by refresh(day) if the graph changed and they are at least
+# `staleness` days old.
+#
+# Starts from the measures given (assumed to match the graph right now).
+# Measures that are None stay None. Travelers (communities) are not updated.
+class DynamicMeasures(object):
+
+    def __init__(self, model, traveler_set=None, mvc_set=None, vert_avg_dist=None, number_vertex_shortest=None, Page_Rank=None, Cluster_Coeff=None, avg_degree=0, avg_dist=0, staleness=14):
+        self.model = model
+        g = model.graph.graph
+        n = g.number_of_nodes()
+
+        self.travelers = traveler_set
+        self.minimal_vertex_cover = mvc_set
+        self.vertex_average_distance = vert_avg_dist
+        self.number_shortest_paths = number_vertex_shortest
+        self.page_rank = Page_Rank
+        self.cluster_coef = None if Cluster_Coeff is None else get_node_array(Cluster_Coeff, n).astype(float)
+        self.average_degree = avg_degree
+        self.average_distance = avg_dist
+
+        self.staleness = staleness
+        self.last_refresh = 0
+        self.changed = False
+
+        # Triangles and degree (no self loops, like nx.clustering) of every node
+        self.triangles = get_node_array(nx.triangles(g), n).astype(np.int64)
+        self.degrees = np.array([len(set(g[v]) - {v}) for v in range(n)], dtype=np.int64)
+
+    # Call after the edge (u, v) was added (added=True) or removed (added=False)
+    def edge_changed(self, u, v, added):
+        g = self.model.graph.graph
+        sign = 1 if added else -1
+        common = list(nx.common_neighbors(g, u, v))
+
+        self.triangles[[u, v]] += sign*len(common)
+        self.triangles[common] += sign
+        self.degrees[[u, v]] += sign
+        self.average_degree += sign*2/g.number_of_nodes()
+
+        # Only these nodes' clustering coefficients changed
+        if self.cluster_coef is not None:
+            nodes = np.array([u, v] + common, dtype=np.int64)
+            d = self.degrees[nodes]
+            self.cluster_coef[nodes] = np.where(d > 1, 2*self.triangles[nodes]/np.maximum(d*(d-1), 1), 0)
+
+        self.changed = True
+
+    # changes is a list of (u, v, added)
+    def edges_changed(self, changes):
+        for u, v, added in changes:
+            self.edge_changed(u, v, added)
+
+    # Recalculate the global measures if they are too old
+    # day is the current day of the simulation
+    def refresh(self, day):
+        if not self.changed or day - self.last_refresh < self.staleness:
+            return
+
+        dists = get_distance_matrix(self.model)
+        self.average_distance = get_avg_distances_all_nodes(self.model, dists)
+        if self.vertex_average_distance is not None:
+            self.vertex_average_distance = get_node_avg_distances_all_nodes(self.model, dists)
+        if self.number_shortest_paths is not None:
+            self.number_shortest_paths = get_node_number_shortest_paths(self.model)
+        if self.page_rank is not None:
+            self.page_rank = get_all_page_rank(self.model)
+        if self.minimal_vertex_cover is not None:
+            self.minimal_vertex_cover = get_min_vertex_cover(self.model)
+
+        self.last_refresh = day
+        self.changed = False
+
+
+# Which edges are bridges (removing them would disconnect the graph)
+# Tell it about every edge added/removed (edge_added, edge_removed)
+#
+# Most questions are answered without the bridge set:
+#   - self loops are never bridges
+#   - an edge to a node with only one neighbour is always a bridge
+#   - an edge in a triangle (the ends have a common neighbour) is never a bridge
+# The bridge set (nx.bridges) is only rebuilt when it might be wrong:
+#   - Adding an edge can turn bridges into non bridges (fine if there are none)
+#   - Removing (u, v) with 2+ common neighbours can't make new bridges
+#   - Removing (u, v) with 1 common neighbour w can only make (u, w) and (w, v) bridges,
+#     so only those are in doubt
+#   - Otherwise anything could have changed
+class BridgeIndex(object):
+
+    def __init__(self, g):
+        self.g = g
+        self.bridges = set()
+        self.valid = False
+        self.doubtful = set()
+
+    # Bridges with an (iterative) lowpoint DFS, a lot faster than nx.bridges
+    def rebuild(self):
+        g = self.g
+        order = {}
+        low = {}
+        self.bridges = set()
+        for root in g:
+            if root in order:
+                continue
+            order[root] = low[root] = len(order)
+            stack = [(root, None, iter(g[root]))]
+            while stack:
+                v, parent, neighbours = stack[-1]
+                for w in neighbours:
+                    if w == v or w == parent:
+                        continue
+                    if w in order:
+                        low[v] = min(low[v], order[w])
+                    else:
+                        order[w] = low[w] = len(order)
+                        stack.append((w, v, iter(g[w])))
+                        break
+                else:
+                    stack.pop()
+                    if parent is not None:
+                        low[parent] = min(low[parent], low[v])
+                        if low[v] > order[parent]:
+                            self.bridges.add(frozenset((parent, v)))
+        self.valid = True
+        self.doubtful = set()
+
+    # Neighbours other than itself (self loops)
+    def number_of_neighbours(self, u):
+        return len(self.g[u]) - (u in self.g[u])
+
+    # Would removing (u, v) disconnect u from v
+    def is_bridge(self, u, v):
+        if u == v:
+            return False
+        if self.number_of_neighbours(u) == 1 or self.number_of_neighbours(v) == 1:
+            return True
+        if any(w in self.g[v] for w in self.g[u] if w != v and w != u):
+            return False
+
+        edge = frozenset((u, v))
+        if not self.valid or edge in self.doubtful:
+            self.rebuild()
+        return edge in self.bridges
+
+    # Call right after (u, v) was added
+    # It can stop other edges from being bridges, or be a new bridge itself (joins two components)
+    def edge_added(self, u, v):
+        if u != v:
+            self.valid = False
+
+    # Call right after (u, v) (not a bridge) was removed
+    def edge_removed(self, u, v):
+        if u == v:
+            return
+        common = [w for w in self.g[u] if w in self.g[v] and w != u and w != v]
+        if len(common) == 1:
+            self.doubtful.add(frozenset((u, common[0])))
+            self.doubtful.add(frozenset((common[0], v)))
+        elif len(common) == 0:
+            self.valid = False
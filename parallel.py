@@ -0,0 +1,127 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.1
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Evaluate the population on a process pool (no SCOOP needed)
+
+End Change Log
+
+Parallel population evaluation with multiprocessing.
+
+The model and all the static measures are given to each worker once, when
+the pool is started (with fork they are just inherited, nothing is pickled).
+After that only the tree (as a string) goes to a worker and only the fitness
+tuple comes back.
+
+Each worker reseeds random and np.random, otherwise every forked worker
+would be running the exact same random numbers.
+
+If processes is 1 there is no pool and everything runs in this process, so
+the drivers can use the same code either way.
+
+NOTE: Dynamic graphs are changed during evaluation, so each worker's copy
+      of the graph drifts on its own.
+
+'''
+
+###########
+# Imports #
+###########
+
+import multiprocessing
+import numpy as np
+import os
+import random
+
+from deap import gp
+
+import evaluate
+
+from language import compile_vectorized
+
+
+# What a worker needs to evaluate a tree
+# Set by init_worker
+_worker = {}
+
+
+# Fitness values used by the GP (max infected, total infected)
+def default_fitness(iterations, iterations_mitigations, m):
+    final_susceptible, max_infected, total_infected, final_removed = evaluate.convert_iterations(iterations, m)
+    return max_infected, total_infected,
+
+def init_worker(pset, eval_function, fitness, vectorized, seed, kwargs):
+    _worker['pset'] = pset
+    _worker['eval_function'] = eval_function
+    _worker['fitness'] = fitness
+    _worker['vectorized'] = vectorized
+    _worker['kwargs'] = kwargs
+
+    # Different random numbers in every worker
+    if seed is None:
+        random.seed()
+        np.random.seed()
+    else:
+        random.seed(seed + os.getpid())
+        np.random.seed((seed + os.getpid()) % 2**32)
+
+# Compile and evaluate a single tree (string) and return its fitness
+# Extra keyword arguments go to the evaluation function (eg. a seed)
+def evaluate_tree(tree, **extra):
+    if _worker['vectorized']:
+        f = compile_vectorized(tree, _worker['pset'])
+    else:
+        f = gp.compile(tree, _worker['pset'])
+
+    kwargs = dict(_worker['kwargs'], **extra)
+    iterations, iterations_mitigations = _worker['eval_function'](f, **kwargs)
+    return _worker['fitness'](iterations, iterations_mitigations, kwargs['m'])
+
+def _evaluate_tree_args(args):
+    tree, extra = args
+    return evaluate_tree(tree, **extra)
+
+# Start the pool
+# The keyword arguments are the same ones given to the evaluation function (through setup_gp)
+# Returns None if processes is 1 (evaluate here instead)
+def setup_pool(processes, pset, eval_function, fitness=default_fitness, vectorized=False, seed=None, **kwargs):
+
+    # Local copy of the worker state, used when there is no pool
+    # Do not reseed this process
+    _worker['pset'] = pset
+    _worker['eval_function'] = eval_function
+    _worker['fitness'] = fitness
+    _worker['vectorized'] = vectorized
+    _worker['kwargs'] = kwargs
+
+    if processes is None or processes <= 1:
+        return None
+
+    # fork means the model and measures are inherited, not pickled
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+
+    return context.Pool(processes, initializer=init_worker, initargs=(pset, eval_function, fitness, vectorized, seed, kwargs))
+
+# Fitness of every tree (strings), in order
+# chunksize of 1 since evaluation times vary a lot
+def evaluate_trees(pool, trees, **extra):
+    jobs = [(tree, extra) for tree in trees]
+    if pool is None:
+        return list(map(_evaluate_tree_args, jobs))
+    return pool.map(_evaluate_tree_args, jobs, chunksize=1)
+
+# Number of processes to use
+# SLURM tells us how many cores we got, otherwise use them all
+def get_processes():
+    if 'SLURM_CPUS_PER_TASK' in os.environ:
+        return int(os.environ['SLURM_CPUS_PER_TASK'])
+    return os.cpu_count()
@@ -0,0 +1,96 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.1
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Race candidate strategies over the validation graphs, dropping the clearly worse ones early
+
+End Change Log
+
+Racing (F-race like) evaluation of candidate strategies.
+
+Validating every candidate on every graph wastes most of the simulations on
+candidates that are obviously bad after a handful of graphs. Here every
+candidate still in the race is evaluated on the next graph, and after
+min_instances graphs each one is compared to the current best (median of the
+key measure) with a one sided Mann-Whitney U test (same test as
+compare_distros_p_vals in eCov-stats). Candidates that are worse with
+p < alpha are dropped and get no more graphs.
+
+Dropped candidates keep the results they got, so they have fewer values than
+the ones that made it to the end.
+
+NOTE: alpha = 0 never drops anyone, which is the same as evaluating everyone
+      on every graph.
+
+'''
+
+###########
+# Imports #
+###########
+
+import numpy as np
+import scipy.stats
+
+import evaluate
+
+
+# Measures recorded for each candidate (same names as the results scripts)
+RESULT_KEYS = ['sus', 'max_inf', 'tot_inf', 'rem', 'tot_mit', 'eff_mit', 'ine_mit']
+
+
+# Empty results for one candidate
+def new_results():
+    return {k: [] for k in RESULT_KEYS}
+
+# The measures from one evaluation
+def get_results(iterations, iterations_mitigations, m):
+    final_susceptible, max_infected, total_infected, final_removed = evaluate.convert_iterations(iterations, m)
+    total_mitigations, effective_mitigations, ineffective_mitigations = evaluate.convert_iterations_mitigations(iterations_mitigations)
+    return dict(zip(RESULT_KEYS, [final_susceptible, max_infected, total_infected, final_removed, total_mitigations, effective_mitigations, ineffective_mitigations]))
+
+# Add the measures from one evaluation to a candidate's results
+def add_results(results, result):
+    for k in RESULT_KEYS:
+        results[k].append(result[k])
+
+# p value of candidate's values being worse than best's values
+def worse_p_val(values, best_values, minimize=True):
+    try:
+        return scipy.stats.mannwhitneyu(values, best_values, alternative='greater' if minimize else 'less')[1]
+    except ValueError:
+        # All the values are the same
+        return 1.0
+
+# Race n_candidates over n_instances (graphs)
+# evaluate_candidate(i, j) evaluates candidate i on instance j and returns a dict of measures (get_results)
+# key is the measure to race on, minimize says if lower is better
+# Returns the results for every candidate and the list of candidates still in the race at the end
+def race(n_candidates, n_instances, evaluate_candidate, key='tot_inf', minimize=True, min_instances=5, alpha=0.05, verbose=True):
+    all_results = [new_results() for _ in range(n_candidates)]
+    alive = list(range(n_candidates))
+
+    for j in range(n_instances):
+        for i in alive:
+            add_results(all_results[i], evaluate_candidate(i, j))
+
+        if j + 1 < min_instances or len(alive) == 1:
+            continue
+
+        medians = [np.median(all_results[i][key]) for i in alive]
+        best = alive[int(np.argmin(medians) if minimize else np.argmax(medians))]
+        alive = [i for i in alive if i == best or worse_p_val(all_results[i][key], all_results[best][key], minimize) >= alpha]
+
+        if verbose:
+            print(j + 1, 'graphs,', len(alive), 'candidates left')
+
+    return all_results, alive
+
+# Total number of evaluations done (to compare with n_candidates * n_instances)
+def count_evaluations(all_results):
+    return sum(len(results[RESULT_KEYS[0]]) for results in all_results)
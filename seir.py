@@ -0,0 +1,357 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.4
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Array backed SEIR model that can be used in place of ndlib's SEIRModel
+
+    0.2 (October 18, 2026):
+        - Batch model: R replicates on the same graph as an (R x n) status matrix
+            * One sparse product per day for all replicates
+            * replicate(r) gives a model-like view of row r for applying mitigations
+
+    0.3 (October 18, 2026):
+        - latent parameter: 'period' (default, alpha is the latent period) or 'probability' (alpha is a daily probability, same as ndlib 6)
+        - NOT a drop-in for ndlib's SEIRModel by default, see below
+        - A batch made from an ndlib model uses 'probability' so it matches that model
+
+    0.4 (October 18, 2026):
+        - latent defaults to 'probability' (ndlib's rule), so the native model is a drop-in for ndlib's SEIRModel
+            * 'period' (alpha as the latent period) is now an explicit opt in, it is a different disease model
+
+End Change Log
+
+Native SEIR model.
+
+Same parameters and status codes as ndlib's SEIRModel (0 S, 2 E, 1 I, 3 R),
+but the status is an int8 array and transmission is one sparse product per
+iteration instead of a python loop over every node.
+
+By default it is the same disease model as the installed ndlib (6.0.1),
+including its E -> I rule (eventp < alpha), so with ALPHA = 6.4 every exposed
+node is infected the next day, same as ndlib.
+
+WARNING: latent='period' deliberately changes the disease model, alpha is then
+         the latent period (see below), which gives slower, smaller epidemics.
+         Only use it on purpose, and never compare runs made with the two rules.
+
+iteration() and build_trends() return the same dicts as ndlib, so everything
+downstream (convert_iterations, eCov-stats, etc.) works unchanged.
+
+Parameters:
+    - beta:                 Spread probability (per infected neighbour)
+    - gamma:                Removal probability
+    - alpha:                E -> I, how depends on latent
+    - latent (optional):    'probability' (default) or 'period'
+                                * 'probability' is ndlib 6's rule, exposed become infected with prob alpha each day
+                                * 'period' treats alpha as the latent period (opt in, NOT ndlib's model),
+                                  exposed become infected with prob 1 - exp(-(t - t_exposed)/alpha)
+    - fraction_infected:    Fraction of nodes infected at the start
+    - tp_rate (optional):   1 (default) if infection prob depends on the number of infected neighbours
+
+Nodes are relabeled to 0 -- n-1 if they are not already.
+
+If the graph's edges are changed (dynamic graphs), call graph_changed() so
+the adjacency matrix gets rebuilt.
+
+BatchSEIRModel runs R independent replicates on one (static) graph at once.
+iteration() returns a list with one ndlib style dict per replicate.
+
+'''
+
+###########
+# Imports #
+###########
+
+import networkx as nx
+import numpy as np
+import scipy.sparse
+import warnings
+
+STATUS_SUSCEPTIBLE = 0
+STATUS_EXPOSED = 2
+STATUS_INFECTED = 1
+STATUS_REMOVED = 3
+
+
+# CSR adjacency matrix of an (undirected) networkx graph with nodes 0 -- n-1
+def adjacency_matrix(g):
+    n = g.number_of_nodes()
+    edges = np.array(list(g.edges()), dtype=np.int64).reshape(-1, 2)
+    rows = np.concatenate((edges[:, 0], edges[:, 1]))
+    cols = np.concatenate((edges[:, 1], edges[:, 0]))
+    return scipy.sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+# One day of the epidemic for every row of status (R x n)
+# exposed_at is updated in place, returns the new status
+def step(status, exposed_at, actual_iteration, adjacency, params):
+    beta = params["beta"]
+    gamma = params["gamma"]
+    alpha = params["alpha"]
+
+    actual = status.copy()
+    eventp = np.random.random_sample(status.shape)
+
+    # S -> E
+    # adjacency is symmetric, so (A I^T)^T gives the infected neighbour counts for every row
+    susceptible = status == STATUS_SUSCEPTIBLE
+    infected_neighbours = adjacency.dot((status == STATUS_INFECTED).T.astype(float)).T
+    if params.get("tp_rate", 1) == 1:
+        newly_exposed = susceptible & (eventp < 1 - (1 - beta) ** infected_neighbours)
+    else:
+        newly_exposed = susceptible & (eventp < beta * (infected_neighbours > 0))
+    actual[newly_exposed] = STATUS_EXPOSED
+    exposed_at[newly_exposed] = actual_iteration
+
+    # E -> I, with prob alpha every day (ndlib 6)
+    # or after (t - t_exposed) if alpha is the latent period
+    exposed = status == STATUS_EXPOSED
+    if params.get("latent", "probability") == "probability":
+        latent = alpha
+    else:
+        latent = 1 - np.exp(-(actual_iteration - exposed_at[exposed]) / alpha)
+    to_infected = np.zeros(status.shape, dtype=bool)
+    to_infected[exposed] = eventp[exposed] < latent
+    actual[to_infected] = STATUS_INFECTED
+
+    # I -> R
+    actual[(status == STATUS_INFECTED) & (eventp < gamma)] = STATUS_REMOVED
+
+    return actual
+
+# Count of each status, in the same (key) order as ndlib
+def node_count(status):
+    counts = np.bincount(status, minlength=4)
+    return {st: int(counts[st]) for st in (STATUS_SUSCEPTIBLE, STATUS_EXPOSED, STATUS_INFECTED, STATUS_REMOVED)}
+
+# ndlib style iteration dict from the old and new status of one replicate
+def iteration_dict(iteration, old, actual, node_status=True):
+    changed = np.flatnonzero(actual != old)
+    new_count = node_count(actual)
+    old_count = node_count(old)
+    return {
+        "iteration": iteration,
+        "status": dict(zip(changed.tolist(), actual[changed].tolist())) if node_status else {},
+        "node_count": new_count,
+        "status_delta": {st: new_count[st] - old_count[st] for st in new_count},
+    }
+
+# Same as ndlib's build_trends
+def build_trends(iterations):
+    status_delta = {status: [] for status in (STATUS_SUSCEPTIBLE, STATUS_EXPOSED, STATUS_INFECTED, STATUS_REMOVED)}
+    node_count = {status: [] for status in (STATUS_SUSCEPTIBLE, STATUS_EXPOSED, STATUS_INFECTED, STATUS_REMOVED)}
+
+    for it in iterations:
+        for st in status_delta:
+            status_delta[st].append(it["status_delta"][st])
+            node_count[st].append(it["node_count"][st])
+
+    return [{"trends": {"node_count": node_count, "status_delta": status_delta}}]
+
+
+# Bare bones version of the graph wrapper ndlib uses
+# model.graph.graph is the networkx graph
+class Graph(object):
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.directed = nx.is_directed(graph)
+
+    @property
+    def nodes(self):
+        return self.graph.nodes()
+
+    @property
+    def edges(self):
+        return self.graph.edges()
+
+    def number_of_nodes(self):
+        return self.graph.number_of_nodes()
+
+    def number_of_edges(self):
+        return self.graph.number_of_edges()
+
+    def has_edge(self, u, v):
+        return self.graph.has_edge(u, v)
+
+    def neighbors(self, node):
+        return list(self.graph.neighbors(node))
+
+
+class SEIRModel(object):
+
+    def __init__(self, graph):
+
+        # Need nodes to be 0 -- n-1 so they can index the arrays
+        if list(graph.nodes()) != list(range(graph.number_of_nodes())):
+            graph = nx.convert_node_labels_to_integers(graph, ordering='sorted')
+
+        self.graph = Graph(graph)
+        self.name = "SEIR"
+        self.available_statuses = {
+            "Susceptible": STATUS_SUSCEPTIBLE,
+            "Exposed": STATUS_EXPOSED,
+            "Infected": STATUS_INFECTED,
+            "Removed": STATUS_REMOVED,
+        }
+        self.params = {"nodes": {}, "edges": {}, "model": {"tp_rate": 1}, "status": {}}
+
+        n = graph.number_of_nodes()
+        self.status = np.zeros(n, dtype=np.int8)
+        self.initial_status = self.status
+        self.exposed_at = np.zeros(n, dtype=np.int32)
+        self.actual_iteration = 0
+
+        self.adjacency = None
+        self.graph_changed()
+
+    # Rebuild the adjacency matrix
+    # Must be called if edges are added/removed
+    def graph_changed(self):
+        self.adjacency = adjacency_matrix(self.graph.graph)
+
+    # Takes an ndlib ModelConfig.Configuration
+    def set_initial_status(self, configuration):
+
+        for param, val in configuration.get_model_parameters().items():
+            self.params["model"][param] = val
+
+        if "percentage_infected" in self.params["model"]:
+            self.params["model"]["fraction_infected"] = self.params["model"]["percentage_infected"]
+
+        # Specific nodes set as infected
+        for param, nodes in configuration.get_model_configuration().items():
+            self.params["status"][param] = nodes
+
+        if "Infected" in self.params["status"]:
+            self.reset(self.params["status"]["Infected"])
+        else:
+            self.reset()
+
+    # Go back to the start with new initial infected (or the given ones)
+    def reset(self, infected_nodes=None):
+        self.actual_iteration = 0
+        self.status = np.zeros(self.graph.number_of_nodes(), dtype=np.int8)
+        self.exposed_at[:] = 0
+
+        if infected_nodes is None:
+            number_of_initial_infected = self.graph.number_of_nodes() * float(self.params["model"].get("fraction_infected", 0))
+            if 0 < number_of_initial_infected < 1:
+                warnings.warn("The fraction_infected value is too low given the number of nodes of the selected graph: a single node will be set as infected")
+                number_of_initial_infected = 1
+            available_nodes = np.arange(self.graph.number_of_nodes())
+            infected_nodes = np.random.choice(available_nodes, int(number_of_initial_infected), replace=False)
+
+        self.status[np.asarray(infected_nodes, dtype=np.int64)] = STATUS_INFECTED
+        self.initial_status = self.status.copy()
+        return self
+
+    # One day of the epidemic
+    # Returns the same dict as ndlib's iteration
+    def iteration(self, node_status=True):
+
+        if self.actual_iteration == 0:
+            self.actual_iteration += 1
+            return {
+                "iteration": 0,
+                "status": dict(enumerate(self.status.tolist())) if node_status else {},
+                "node_count": node_count(self.status),
+                "status_delta": {st: 0 for st in self.available_statuses.values()},
+            }
+
+        old = self.status
+        self.status = step(old, self.exposed_at, self.actual_iteration, self.adjacency, self.params["model"])
+        self.actual_iteration += 1
+
+        return iteration_dict(self.actual_iteration - 1, old, self.status, node_status)
+
+    def iteration_bunch(self, bunch_size, node_status=True):
+        return [self.iteration(node_status) for _ in range(bunch_size)]
+
+    def build_trends(self, iterations):
+        return build_trends(iterations)
+
+
+# Model-like view of one row of a batch
+# Enough for the mitigation functions (status, graph)
+class Replicate(object):
+
+    def __init__(self, batch, r):
+        self.batch = batch
+        self.r = r
+        self.graph = batch.graph
+        self.params = batch.params
+
+    # Row of the batch's current status (writes go to the batch)
+    @property
+    def status(self):
+        return self.batch.status[self.r]
+
+
+class BatchSEIRModel(object):
+
+    # model is an (already configured) SEIR model, native or ndlib
+    # Only the graph and parameters are used
+    def __init__(self, model, replicates):
+        graph = model.graph.graph
+        if list(graph.nodes()) != list(range(graph.number_of_nodes())):
+            graph = nx.convert_node_labels_to_integers(graph, ordering='sorted')
+
+        self.graph = Graph(graph)
+        self.params = {"model": dict(model.params["model"])}
+        self.params["model"].setdefault("tp_rate", 1)
+
+        # Same E -> I rule as the model it was made from
+        if not isinstance(model, SEIRModel):
+            self.params["model"]["latent"] = "probability"
+        self.available_statuses = {
+            "Susceptible": STATUS_SUSCEPTIBLE,
+            "Exposed": STATUS_EXPOSED,
+            "Infected": STATUS_INFECTED,
+            "Removed": STATUS_REMOVED,
+        }
+        self.replicates = replicates
+        self.adjacency = adjacency_matrix(graph)
+        self.reset()
+
+    # New initial infected for every replicate
+    def reset(self):
+        n = self.graph.number_of_nodes()
+        self.actual_iteration = 0
+        self.status = np.zeros((self.replicates, n), dtype=np.int8)
+        self.exposed_at = np.zeros((self.replicates, n), dtype=np.int32)
+
+        number_of_initial_infected = int(n * float(self.params["model"].get("fraction_infected", 0)))
+        for r in range(self.replicates):
+            self.status[r, np.random.choice(n, number_of_initial_infected, replace=False)] = STATUS_INFECTED
+        return self
+
+    def replicate(self, r):
+        return Replicate(self, r)
+
+    # One day for all replicates
+    # Returns a list of ndlib style dicts (one per replicate)
+    def iteration(self, node_status=True):
+
+        if self.actual_iteration == 0:
+            self.actual_iteration += 1
+            return [{
+                "iteration": 0,
+                "status": dict(enumerate(row.tolist())) if node_status else {},
+                "node_count": node_count(row),
+                "status_delta": {st: 0 for st in self.available_statuses.values()},
+            } for row in self.status]
+
+        old = self.status
+        self.status = step(old, self.exposed_at, self.actual_iteration, self.adjacency, self.params["model"])
+        self.actual_iteration += 1
+
+        return [iteration_dict(self.actual_iteration - 1, old[r], self.status[r], node_status) for r in range(self.replicates)]
+
+    def build_trends(self, iterations):
+        return build_trends(iterations)
@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       June 9, 2020
 
-Version:    0.2
+Version:    0.5
 
 
 Change Log:
@@ -19,6 +19,14 @@ Change Log:
             * All this took was adding axis=0 to the register function on the statistics object:
                 - For example: mstats.register("avg", np.mean, axis=0)
 
+    0.4 (October 18, 2026):
+        - Register the vectorized compiler (compile_vectorized) alongside the regular one
+
+    0.5 (October 18, 2026):
+        - selection option for multi objective (Pareto) selection with NSGA-II or NSGA-III
+            * toolbox.survive picks the survivors of parents + offspring (log non dominated sort, N log N for 2 objectives)
+            * toolbox.select picks the parents (crowded tournaments for NSGA-II, random for NSGA-III)
+
 End Change Log
 
 setup the GP stuff
@@ -41,8 +49,19 @@ from deap import creator
 from deap import tools
 from deap import gp
 
+from language import compile_vectorized
+
+
+# Parent selection for NSGA-II
+# Tournaments on rank and crowding distance need a multiple of 4, otherwise random
+def select_crowded(individuals, k):
+    if len(individuals) % 4 == 0 and k % 4 == 0 and k <= len(individuals):
+        return tools.selTournamentDCD(individuals, k)
+    return tools.selRandom(individuals, k)
 
-def setup_gp(language, eval_function, **kwargs):
+# selection is 'tournament' (lexicographic tournament, elitism with selBest), 'nsga2' or 'nsga3'
+# ref_divisions is the number of divisions of each objective for the NSGA-III reference points
+def setup_gp(language, eval_function, selection='tournament', ref_divisions=12, **kwargs):
 
     toolbox = base.Toolbox()
 
@@ -64,12 +83,20 @@ def setup_gp(language, eval_function, **kwargs):
     toolbox.register("individual", tools.initIterate, creator.Individual, toolbox.expr)
     toolbox.register("population", tools.initRepeat, list, toolbox.individual)
     toolbox.register("compile", gp.compile, pset=language)
+    toolbox.register("compile_vectorized", compile_vectorized, pset=language)
 
     # Operators
     #toolbox.register("evaluate", evaluate.evaluate_individual, m=model, traveler_set=travelers, total_iterations=ITERATIONS, measure_every=MEASURE_EVERY, mitigations_per_measure=MITIGATIONS_PER_MEASURE, rollover=ROLLOVER)
     toolbox.register("evaluate", eval_function, **kwargs)
     toolbox.register("elitism", tools.selBest, k=1)             ##### can we add an index to access a specific objective?
-    toolbox.register("select", tools.selTournament, tournsize=2)
+    if selection == 'nsga2':
+        toolbox.register("survive", tools.selNSGA2, nd='log')
+        toolbox.register("select", select_crowded)
+    elif selection == 'nsga3':
+        toolbox.register("survive", tools.selNSGA3, ref_points=tools.uniform_reference_points(len(creator.FitnessMin.weights), ref_divisions), nd='log')
+        toolbox.register("select", tools.selRandom)
+    else:
+        toolbox.register("select", tools.selTournament, tournsize=2)
     toolbox.register("mate", gp.cxOnePoint)
     toolbox.register("expr_mut", gp.genFull, min_=0, max_=2)
     toolbox.register("mutate", gp.mutUniform, expr=toolbox.expr_mut, pset=language)
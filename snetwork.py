@@ -2,7 +2,7 @@
 Author:     James Hughes
 Date:       June 9, 2020
 
-Version:    0.6
+Version:    0.10
 
 
 Change Log:
@@ -30,6 +30,18 @@ Change Log:
         - Kinda' like a BA graph, but makes it cluster
         - This idea came from the talk at Dalhousie where it was suggested by to have better clustering graphs
 
+    0.7 (October 18, 2026):
+        - Option to use the native (array backed) SEIR model from seir instead of ndlib's
+        - Can pass an already made graph (graph=...)
+
+    0.8 (October 18, 2026):
+        - Making the graph split out of setup_network (make_graph) so graphs can be made without a model (ensemble)
+
+    0.9 (October 18, 2026):
+        - latent option for the native model ('period' or 'probability', see seir)
+
+    0.10 (October 18, 2026):
+        - latent defaults to 'probability' (ndlib's rule), 'period' is an opt in
 
 End Change Log
 
@@ -49,6 +61,8 @@ import networkx.algorithms.community as comm
 import os
 import random
 
+import seir
+
 from ndlib.viz.mpl.DiffusionTrend import DiffusionTrend
 from ndlib.viz.mpl.DiffusionPrevalence import DiffusionPrevalence
 
@@ -58,11 +72,10 @@ from ndlib.viz.mpl.DiffusionPrevalence import DiffusionPrevalence
 # Epidemic Setup #
 ##################
 
-def setup_network(alpha, beta, gamma, infected, directory=None, name=None, size=None, edge_p=None, knn=None, rewire_p=None, drop=None, m=None, n_edges=None, triangle_p=None):
+# Make a graph
+# The graph type is picked by which parameters are given (same as setup_network)
+def make_graph(directory=None, name=None, size=None, edge_p=None, knn=None, rewire_p=None, drop=None, m=None, n_edges=None, triangle_p=None):
 
-    # Network topology
-    
-    # Create Graph  
     if edge_p != None:
         print("Making ER Graph")
         g = nx.erdos_renyi_graph(size, edge_p)
@@ -88,8 +101,24 @@ def setup_network(alpha, beta, gamma, infected, directory=None, name=None, size=
         print("Loading custom Graph")
         g = nx.read_adjlist(os.path.join(directory, name), delimiter='\t', nodetype=int)
 
+    return g
+
+def setup_network(alpha, beta, gamma, infected, directory=None, name=None, size=None, edge_p=None, knn=None, rewire_p=None, drop=None, m=None, n_edges=None, triangle_p=None, graph=None, native=False, latent='probability'):
+
+    # Network topology
+    
+    # Create Graph  
+    if graph != None:
+        g = graph
+
+    else:
+        g = make_graph(directory=directory, name=name, size=size, edge_p=edge_p, knn=knn, rewire_p=rewire_p, drop=drop, m=m, n_edges=n_edges, triangle_p=triangle_p)
+
     # Model selection
-    m = ep.SEIRModel(g)
+    if native:
+        m = seir.SEIRModel(g)
+    else:
+        m = ep.SEIRModel(g)
 
     # Model Configuration
     cfg = mc.Configuration()
@@ -97,6 +126,9 @@ def setup_network(alpha, beta, gamma, infected, directory=None, name=None, size=
     cfg.add_model_parameter('gamma', gamma)
     cfg.add_model_parameter('alpha', alpha)
     cfg.add_model_parameter("fraction_infected", infected)
+    # ndlib always uses alpha as a probability, the native model does too unless latent='period'
+    if native:
+        cfg.add_model_parameter('latent', latent)
     m.set_initial_status(cfg)
 
     return m
@@ -0,0 +1,122 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.2
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Asynchronous steady state evolution on the process pool
+
+    0.2 (October 18, 2026):
+        - ValueError if crossover and mutation are both 0 (every offspring would be an untouched copy, forever)
+
+End Change Log
+
+Asynchronous steady state GP.
+
+With generations every evaluation has to finish before selection and varAnd
+can run, and outbreaks that die out early are way cheaper than the ones that
+do not, so most of the workers sit and wait for the slowest one at the end of
+every generation.
+
+Here there are no generations. There are always `in_flight` offspring being
+evaluated on the pool. When one comes back it goes straight into the
+population, replacing the worst of `replace_size` individuals picked at random
+(tournament replacement), and a new offspring is made (toolbox.select,
+toolbox.mate, toolbox.mutate through varAnd, same as the generational loop)
+and sent off.
+
+With replace_size >= 2 the best individual can never be replaced (elitism).
+
+Stats are recorded every len(population) evaluations, as a "generation", so
+the logbook looks like the generational one.
+
+NOTE: Offspring are made from the population as it is when they are sent
+      off, so some parents may be replaced before their children come back.
+
+NOTE: Every offspring is evaluated once, straight on the pool. There is no
+      fitness cache, fingerprinting or common random numbers here.
+
+'''
+
+###########
+# Imports #
+###########
+
+import queue
+import random
+
+from deap import algorithms
+
+import parallel
+
+
+# Evaluate a tree (string) on the pool, (ticket, fitness) goes on results when it is done
+# With no pool it is evaluated right away
+def submit(pool, results, ticket, tree, extra):
+    if pool is None:
+        results.put((ticket, parallel.evaluate_tree(tree, **extra)))
+    else:
+        pool.apply_async(parallel.evaluate_tree, (tree,), extra, callback=lambda fitness: results.put((ticket, fitness)), error_callback=lambda e: results.put((ticket, e)))
+
+# Offspring of two parents (toolbox.select), crossover and/or mutation with varAnd
+def make_offspring(toolbox, population, crossover, mutation):
+    parents = list(map(toolbox.clone, toolbox.select(population, 2)))
+    return algorithms.varAnd(parents, toolbox, crossover, mutation)
+
+# Index of the individual to replace
+# Worst (fitness) of size individuals picked at random
+def select_replace(population, size):
+    contestants = random.sample(range(len(population)), size)
+    return min(contestants, key=lambda i: population[i].fitness)
+
+# Evolve the (evaluated) population for `evaluations` offspring evaluations
+# Records stats in the logbook every len(population) evaluations, starting after generation gen
+# callback(gen) is called after each record (eg. checkpoints)
+# Extra keyword arguments go to the evaluation function
+def evolve(pool, toolbox, population, evaluations, crossover, mutation, in_flight=1, replace_size=2, mstats=None, logbook=None, gen=0, callback=None, **extra):
+    # Untouched copies of parents are never evaluated, so there would never be anything to evaluate
+    if crossover <= 0 and mutation <= 0:
+        raise ValueError('Steady state needs crossover or mutation (both are 0)')
+
+    results = queue.Queue()
+
+    # ticket -> offspring being evaluated
+    pending = {}
+    ticket = 0
+    submitted = 0
+    done = 0
+
+    while done < evaluations:
+
+        # Keep the pool busy
+        while len(pending) < in_flight and submitted < evaluations:
+            for child in make_offspring(toolbox, population, crossover, mutation):
+                # Untouched copies of a parent, nothing new to evaluate
+                if child.fitness.valid or submitted >= evaluations:
+                    continue
+                pending[ticket] = child
+                submit(pool, results, ticket, str(child), extra)
+                ticket += 1
+                submitted += 1
+
+        t, fitness = results.get()
+        if isinstance(fitness, Exception):
+            raise fitness
+
+        child = pending.pop(t)
+        child.fitness.values = fitness
+        population[select_replace(population, replace_size)] = child
+        done += 1
+
+        if done % len(population) == 0:
+            gen += 1
+            if logbook is not None:
+                logbook.record(gen=gen, **mstats.compile(population))
+            if callback is not None:
+                callback(gen)
+
+    return population
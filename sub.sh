@@ -2,6 +2,7 @@
 #SBATCH --account=def-jhughe54
 #SBATCH --time=4-0
 #SBATCH --mem-per-cpu=10M
+#SBATCH --cpus-per-task=8
 #SBATCH --job-name=eCovid-GP
 # These are commented out for initial testing 
 # SBATCH --output=/dev/null 
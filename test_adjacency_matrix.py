@@ -0,0 +1,37 @@
+import networkx as nx
+import numpy as np
+
+import seir
+from measures import get_adjacency_matrix, get_avg_neighbour_degrees, get_degrees, get_neighbour_status_counts
+
+
+def get_graph():
+    g = nx.gnp_random_graph(40, 0.1, seed=0)
+    g.add_edges_from([(0, 0), (5, 5), (5, 6)])
+    return g
+
+# Self loops are one entry, every other edge is mirrored
+def test_self_loops():
+    g = get_graph()
+    adjacency = get_adjacency_matrix(seir.SEIRModel(g))
+    assert adjacency[0, 0] == 1 and adjacency[5, 5] == 1
+    assert (adjacency != adjacency.T).nnz == 0
+
+# Degrees (and average neighbour degrees) match networkx, self loops included
+def test_degrees_against_networkx():
+    g = get_graph()
+    adjacency = get_adjacency_matrix(seir.SEIRModel(g))
+    degrees = get_degrees(adjacency)
+    assert dict(enumerate(degrees.tolist())) == dict(g.degree())
+
+    avgs = get_avg_neighbour_degrees(adjacency, degrees)
+    expected = nx.average_neighbor_degree(g)
+    assert np.allclose(avgs, [expected[v] for v in range(len(avgs))])
+
+# Neighbour status counts match counting g.neighbors one node at a time
+def test_neighbour_status_counts():
+    g = get_graph()
+    status = np.random.RandomState(0).randint(0, 4, size=g.number_of_nodes())
+    counts = get_neighbour_status_counts(get_adjacency_matrix(seir.SEIRModel(g)), status)
+    for v in g.nodes():
+        assert counts[v].tolist() == np.bincount(status[list(g.neighbors(v))], minlength=4).tolist()
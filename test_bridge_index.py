@@ -0,0 +1,46 @@
+import random
+
+import networkx as nx
+
+from measures import BridgeIndex
+
+
+def bridges(g):
+    return {frozenset(e) for e in nx.bridges(g)}
+
+def check(g, index):
+    expected = bridges(g)
+    for u, v in g.edges():
+        assert index.is_bridge(u, v) == (frozenset((u, v)) in expected), (u, v)
+
+
+# Two triangles joined by one edge, that edge is a bridge
+def test_edge_joining_components():
+    g = nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)])
+    index = BridgeIndex(g)
+    index.rebuild()
+    assert index.bridges == set()
+
+    g.add_edge(0, 3)
+    index.edge_added(0, 3)
+    assert index.is_bridge(0, 3)
+    check(g, index)
+
+# Random edges added and (non bridge) edges removed on graphs that can be disconnected
+def test_churn_against_networkx():
+    random.seed(0)
+    for _ in range(20):
+        g = nx.gnp_random_graph(30, 0.06, seed=random.randrange(1000))
+        index = BridgeIndex(g)
+        index.rebuild()
+        for _ in range(40):
+            if random.random() < 0.5:
+                u, v = random.sample(list(g.nodes()), 2)
+                g.add_edge(u, v)
+                index.edge_added(u, v)
+            elif g.number_of_edges() > 0:
+                u, v = random.choice(list(g.edges()))
+                if not index.is_bridge(u, v):
+                    g.remove_edge(u, v)
+                    index.edge_removed(u, v)
+            check(g, index)
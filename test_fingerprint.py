@@ -0,0 +1,28 @@
+import networkx as nx
+
+import evaluate
+import fingerprint
+import snetwork
+
+
+def get_sample(**kwargs):
+    g = nx.barabasi_albert_graph(300, 3, seed=0)
+    m = snetwork.setup_network(alpha=0.2, beta=0.1, gamma=0.1, infected=0.05, graph=g, native=True)
+    return g, fingerprint.get_fingerprint_sample(m, set(), **kwargs)
+
+# Trees that only differ in a threshold on a global count should get different fingerprints
+def test_global_count_thresholds():
+    g, sample = get_sample()
+    n = g.number_of_nodes()
+    for column in [evaluate.FEATURE_NUM_SUSEXP, evaluate.FEATURE_NUM_INFECT, evaluate.FEATURE_NUM_REMOVE]:
+        keys = set()
+        for threshold in range(0, n, n // 30):
+            keys.add(fingerprint.fingerprint(lambda *inputs: inputs[column] > threshold, sample))
+        assert len(keys) == len(range(0, n, n // 30)), column
+
+# Same sample (fixed seed) every time
+def test_sample_is_fixed():
+    _, a = get_sample()
+    _, b = get_sample()
+    f = lambda *inputs: inputs[evaluate.FEATURE_NB_INFECT] > 1
+    assert fingerprint.fingerprint(f, a) == fingerprint.fingerprint(f, b)
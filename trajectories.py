@@ -0,0 +1,275 @@
+'''
+Author:     James Hughes
+Date:       October 18, 2026
+
+Version:    0.4
+
+
+Change Log:
+    0.1 (October 18, 2026):
+        - Initial version.
+        - Columnar (npz) results instead of pickled lists of iteration dicts
+
+    0.2 (October 18, 2026):
+        - StreamingSummary to summarize replicates as they finish instead of keeping them all
+
+    0.3 (October 18, 2026):
+        - get_all_trends gives a clear error for streaming summaries (no per replicate trajectories to make trends from)
+        - StreamingSummary writes the raw file after every replicate by default
+
+    0.4 (October 18, 2026):
+        - Results can be saved with the traveler definition they were made with (measures.get_traveler_definition)
+
+End Change Log
+
+Columnar trajectories.
+
+The test drivers used to pickle (all_iterations, all_iterations_mitigations),
+lists of ndlib style dicts for every day of every replicate, and the stats
+unpickled all of it just to get the counts back out. Here the same results are
+kept as arrays (replicates x days):
+
+    susceptible, exposed, infected, removed     Node counts each day
+    mitigation_total                            Mitigations used each measurement day
+    mitigation_effective                        (replicates x measurement days)
+    mitigation_ineffective
+    mitigation_day                              Day of each measurement day
+
+and optionally (events=True) the per node changes as flat arrays, one entry per change:
+
+    event_replicate, event_day, event_node, event_status                Status changes (day 0 is every node's initial status)
+    mitigation_event_replicate, mitigation_event_day, mitigation_event_node     Nodes mitigated
+
+Everything is saved in one compressed npz.
+
+A StreamingSummary takes one replicate at a time and only keeps
+    - the summary measures of each replicate (get_single_measures)
+    - a histogram of each status count for every day (exact per day means and quantiles)
+    - the mitigation totals for every measurement day (summed)
+and can append every replicate's counts to a raw file as it goes. With the
+default flush_every=1 only the replicate running when the run dies is lost
+(with flush_every=k up to k replicates are). Its npz has the measures
+(summary_<measure>) so the stats tables can use it like trajectories, but
+there are no per replicate trajectories, so no trends/plots (get_all_trends).
+
+'''
+
+###########
+# Imports #
+###########
+
+import numpy as np
+import os
+
+from evaluate import STATUS_SUSCEPTIBLE, STATUS_EXPOSED, STATUS_INFECTED, STATUS_REMOVED
+
+
+# Array name for each status
+STATUS_NAMES = {STATUS_SUSCEPTIBLE: 'susceptible', STATUS_EXPOSED: 'exposed', STATUS_INFECTED: 'infected', STATUS_REMOVED: 'removed'}
+
+# Array name for each of the mitigation totals
+MITIGATION_NAMES = {'total': 'mitigation_total', 'effective': 'mitigation_effective', 'ineffective': 'mitigation_ineffective'}
+
+# Per replicate measures (get_single_measures)
+MEASURE_KEYS = ['susceptible', 'max_infected', 'total_infected', 'removed', 'removed_p', 'mitigation', 'mitigation_effective', 'mitigation_ineffective']
+
+
+# Columnar version of the lists of iterations and iterations_mitigations (one of each per replicate)
+# events keeps the per node changes too
+def from_iterations(all_iterations, all_iterations_mitigations, events=False):
+    trajectories = {}
+
+    for status, name in STATUS_NAMES.items():
+        trajectories[name] = np.array([[it['node_count'][status] for it in iterations] for iterations in all_iterations], dtype=np.int32)
+
+    for key, name in MITIGATION_NAMES.items():
+        trajectories[name] = np.array([[it['total_mitigations'][key] for it in iterations_mitigations] for iterations_mitigations in all_iterations_mitigations], dtype=np.int32)
+    trajectories['mitigation_day'] = np.array([it['iteration'] for it in all_iterations_mitigations[0]] if all_iterations_mitigations else [], dtype=np.int32)
+
+    if events:
+        replicate, day, node, status = [], [], [], []
+        for r, iterations in enumerate(all_iterations):
+            for it in iterations:
+                replicate += [r] * len(it['status'])
+                day += [it['iteration']] * len(it['status'])
+                node += list(it['status'].keys())
+                status += list(it['status'].values())
+        trajectories['event_replicate'] = np.array(replicate, dtype=np.int32)
+        trajectories['event_day'] = np.array(day, dtype=np.int16)
+        trajectories['event_node'] = np.array(node, dtype=np.int32)
+        trajectories['event_status'] = np.array(status, dtype=np.int8)
+
+        replicate, day, node = [], [], []
+        for r, iterations_mitigations in enumerate(all_iterations_mitigations):
+            for it in iterations_mitigations:
+                replicate += [r] * len(it['status'])
+                day += [it['iteration']] * len(it['status'])
+                node += list(it['status'].keys())
+        trajectories['mitigation_event_replicate'] = np.array(replicate, dtype=np.int32)
+        trajectories['mitigation_event_day'] = np.array(day, dtype=np.int16)
+        trajectories['mitigation_event_node'] = np.array(node, dtype=np.int32)
+
+    return trajectories
+
+# Written to a temp file first so a half written file is never loaded
+# traveler_definition (measures.get_traveler_definition) is saved with them if given
+def save_trajectories(path, trajectories, traveler_definition=None):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if traveler_definition is not None:
+        trajectories = dict(trajectories, traveler_definition=traveler_definition)
+    tmp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, **trajectories)
+    os.replace(tmp, path)
+
+def load_trajectories(path):
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+# Number of replicates
+def get_replicates(trajectories):
+    return len(trajectories['susceptible'])
+
+# Same as eCov-stats get_single_measures, straight from the arrays
+def get_single_measures(trajectories):
+    # Streaming summaries only have the measures
+    if 'summary_susceptible' in trajectories:
+        return {k: trajectories['summary_' + k] for k in MEASURE_KEYS}
+
+    effective = trajectories['mitigation_effective'].sum(axis=1)
+
+    measures = {}
+    measures['susceptible'] = trajectories['susceptible'][:, -1]
+    measures['max_infected'] = trajectories['infected'].max(axis=1)
+    measures['total_infected'] = trajectories['infected'].sum(axis=1)      # WARNING. This is NOT total, but area under curve
+    measures['removed'] = trajectories['removed'][:, -1]
+    measures['removed_p'] = trajectories['removed'][:, -1] - effective
+    measures['mitigation'] = trajectories['mitigation_total'].sum(axis=1)
+    measures['mitigation_effective'] = effective
+    measures['mitigation_ineffective'] = trajectories['mitigation_ineffective'].sum(axis=1)
+    return measures
+
+# Trends of every replicate (like build_trends and mitigation_trends give)
+# node_count for the mitigations is the running total
+# NOTE: status_delta here is the day to day change of node_count, so unlike the model's it includes mitigations
+def get_all_trends(trajectories):
+    if 'summary_susceptible' in trajectories:
+        raise ValueError('Streaming summary results (STREAMING) have no per replicate trajectories to make trends from, load the .raw file (load_raw) or rerun without STREAMING')
+
+    iterations_trends = []
+    mitigations_trends = []
+
+    for r in range(get_replicates(trajectories)):
+        node_count = {status: trajectories[name][r].tolist() for status, name in STATUS_NAMES.items()}
+        status_delta = {status: np.diff(trajectories[name][r], prepend=trajectories[name][r][0]).tolist() for status, name in STATUS_NAMES.items()}
+        iterations_trends.append({'node_count': node_count, 'status_delta': status_delta})
+
+        mitigations_trends.append({'node_count': {key: np.cumsum(trajectories[name][r]).tolist() for key, name in MITIGATION_NAMES.items()},
+                                   'status_delta': {key: trajectories[name][r].tolist() for key, name in MITIGATION_NAMES.items()}})
+
+    return np.array(iterations_trends), np.array(mitigations_trends)
+
+# Rows of the raw file (one per replicate) back to trajectories
+# days and measurement_days are the number of days and mitigation days of a replicate
+# A partly written last row (run died while writing) is ignored
+def load_raw(path, days, measurement_days):
+    row = len(STATUS_NAMES) * days + len(MITIGATION_NAMES) * measurement_days
+    data = np.fromfile(path, dtype=np.int32)
+    data = data[:len(data) - len(data) % row].reshape(-1, row)
+
+    trajectories = {}
+    start = 0
+    for name in list(STATUS_NAMES.values()):
+        trajectories[name] = data[:, start:start + days]
+        start += days
+    for name in list(MITIGATION_NAMES.values()):
+        trajectories[name] = data[:, start:start + measurement_days]
+        start += measurement_days
+    return trajectories
+
+
+class StreamingSummary(object):
+
+    # nodes is the number of nodes in the graph (counts go from 0 to nodes)
+    # If raw_path is given every replicate's counts are appended to it, written every flush_every replicates
+    def __init__(self, nodes, raw_path=None, flush_every=1):
+        self.nodes = nodes
+        self.replicates = 0
+        self.measures = {k: [] for k in MEASURE_KEYS}
+
+        # Made when the first replicate comes in (need the number of days)
+        self.histograms = None
+        self.mitigation_sums = None
+        self.mitigation_day = None
+
+        self.raw_path = raw_path
+        self.flush_every = flush_every
+        self.raw_rows = []
+        if raw_path is not None:
+            os.makedirs(os.path.dirname(raw_path) or '.', exist_ok=True)
+            open(raw_path, 'wb').close()
+
+    def __len__(self):
+        return self.replicates
+
+    # One replicate's iterations and iterations_mitigations
+    def add(self, iterations, iterations_mitigations):
+        trajectories = from_iterations([iterations], [iterations_mitigations])
+
+        measures = get_single_measures(trajectories)
+        for k in MEASURE_KEYS:
+            self.measures[k].append(int(measures[k][0]))
+
+        if self.histograms is None:
+            days = trajectories['susceptible'].shape[1]
+            self.histograms = {name: np.zeros((days, self.nodes + 1), dtype=np.int64) for name in STATUS_NAMES.values()}
+            self.mitigation_sums = {name: np.zeros(len(trajectories['mitigation_day']), dtype=np.int64) for name in MITIGATION_NAMES.values()}
+            self.mitigation_day = trajectories['mitigation_day']
+
+        for name, histogram in self.histograms.items():
+            histogram[np.arange(len(histogram)), trajectories[name][0]] += 1
+        for name in self.mitigation_sums:
+            self.mitigation_sums[name] += trajectories[name][0]
+
+        self.replicates += 1
+
+        if self.raw_path is not None:
+            self.raw_rows.append(np.concatenate([trajectories[name][0] for name in list(STATUS_NAMES.values()) + list(MITIGATION_NAMES.values())]))
+            if len(self.raw_rows) >= self.flush_every:
+                self.flush()
+
+    # Append the replicates waiting to be written to the raw file
+    def flush(self):
+        if self.raw_path is None or not self.raw_rows:
+            return
+        with open(self.raw_path, 'ab') as f:
+            np.array(self.raw_rows, dtype=np.int32).tofile(f)
+        self.raw_rows = []
+
+    # Same as get_single_measures
+    def get_single_measures(self):
+        return {k: np.array(v) for k, v in self.measures.items()}
+
+    # Mean count of a status (name, eg. 'infected') for every day
+    def get_mean(self, name):
+        return self.histograms[name].dot(np.arange(self.nodes + 1)) / self.replicates
+
+    # q quantile (0 -- 1) of a status count for every day
+    def get_quantile(self, name, q):
+        cumulative = np.cumsum(self.histograms[name], axis=1)
+        return np.argmax(cumulative >= q * self.replicates, axis=1)
+
+    # Mean mitigations (name, eg. 'mitigation_total') for every measurement day
+    def get_mitigation_mean(self, name):
+        return self.mitigation_sums[name] / self.replicates
+
+    # Written to a temp file first so a half written file is never loaded
+    def save(self, path, traveler_definition=None):
+        self.flush()
+        summary = {'summary_' + k: v for k, v in self.get_single_measures().items()}
+        summary['replicates'] = self.replicates
+        if self.histograms is not None:
+            summary.update({'histogram_' + name: histogram for name, histogram in self.histograms.items()})
+            summary.update({'sum_' + name: sums for name, sums in self.mitigation_sums.items()})
+            summary['mitigation_day'] = self.mitigation_day
+        save_trajectories(path, summary, traveler_definition=traveler_definition)